@@ -0,0 +1,249 @@
+"""Benchmark the per-frame hot paths on synthetic signals
+
+Usage:
+    python benchmarks/hotpaths.py [--sizes 60,240,1000] [--chunks 256,1024,4096]
+                                  [--out results.json] [--compare old.json]
+
+Every case reports per-call latency percentiles (microseconds) and the
+peak memory allocated by a call (bytes, via tracemalloc). Results are
+written as JSON, so runs on different commits can be compared with
+`--compare`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Any, Callable, Iterator
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(ROOT))
+
+from viravis.analyzer import (  # noqa: E402
+    AnalyzerFFT,
+    AnalyzerFlat,
+    AnalyzerRolling,
+    AnalyzerRollingEase,
+)
+from viravis.protocol import encode_binary  # noqa: E402
+from viravis.smoothing import fade_np, smooth_hor, smooth_hor_np  # noqa: E402
+from viravis.source import ArraySource  # noqa: E402
+from viravis.vaudio import _stringify_http, _stringify_serial  # noqa: E402
+
+RATE = 44100
+ANALYZERS = (AnalyzerFFT, AnalyzerRolling, AnalyzerRollingEase, AnalyzerFlat)
+
+
+@dataclass
+class Result:
+    name: str
+    params: dict[str, int]
+    calls: int
+    mean_us: float
+    p50_us: float
+    p90_us: float
+    p99_us: float
+    max_us: float
+    peak_alloc_bytes: int
+
+    @property
+    def key(self) -> str:
+        params = ",".join(f"{k}={v}" for k, v in self.params.items())
+        return f"{self.name}[{params}]"
+
+
+@dataclass
+class Case:
+    name: str
+    params: dict[str, int]
+    fn: Callable[[], object]
+    calls: int = field(default=500)
+
+
+def _signal(seconds: float = 5.0) -> np.ndarray:
+    """Noise plus a few tones, with a beat-like envelope"""
+
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * RATE)) / RATE
+    tones = sum(np.sin(2 * np.pi * f * t) for f in (55, 440, 3000))
+    envelope = 0.5 + 0.5 * (np.sin(2 * np.pi * 2 * t) > 0)
+    signal = (tones * 6000 + rng.normal(0, 2000, t.size)) * envelope
+    return np.clip(signal, -32768, 32767).astype(np.int16)
+
+
+def _looping_source(samples: np.ndarray, chunk: int) -> ArraySource:
+    return ArraySource(samples, RATE, chunk, chunk // 2, loop=True)
+
+
+def cases(sizes: list[int], chunks: list[int]) -> Iterator[Case]:
+    samples = _signal()
+    rng = np.random.default_rng(1)
+
+    for chunk in chunks:
+        source = _looping_source(samples, chunk)
+        yield Case("Audio.update", {"chunk": chunk}, source.update)
+
+        for size in sizes:
+            yield Case(
+                "Audio.get_values_np",
+                {"chunk": chunk, "size": size},
+                lambda s=source, n=size: s.get_values_np(n),
+            )
+
+    for size in sizes:
+        for cls in ANALYZERS:
+            analyzer = cls(size, _looping_source(samples, 1024))
+            for _ in range(200):  # Reach a steady state
+                analyzer.update()
+
+            yield Case(f"{cls.__name__}.update", {"size": size}, analyzer.update)
+            yield Case(
+                f"{cls.__name__}.get_data_mirrored",
+                {"size": size},
+                analyzer.get_data_mirrored,
+            )
+
+        data = rng.random(size) * 255
+        data_list = data.tolist()
+        mirrored = np.concatenate((np.flip(data), data))
+
+        yield Case("smooth_hor", {"size": size}, lambda d=data_list: smooth_hor(d, 2))
+        yield Case("smooth_hor_np", {"size": size}, lambda d=data: smooth_hor_np(d, 2))
+        yield Case("fade_np", {"size": size}, lambda d=data: fade_np(d, 0.002))
+        yield Case(
+            "_stringify_serial",
+            {"size": size},
+            lambda d=mirrored: _stringify_serial(d),
+            calls=100,
+        )
+        # The binary serial format, compare with _stringify_serial
+        yield Case(
+            "encode_binary",
+            {"size": size},
+            lambda d=mirrored: encode_binary(d),
+            calls=100,
+        )
+        yield Case(
+            "_stringify_http",
+            {"size": size},
+            lambda d=mirrored: _stringify_http(d),
+            calls=100,
+        )
+
+
+def measure(case: Case, warmup: int = 20) -> Result:
+    for _ in range(warmup):
+        case.fn()
+
+    times = np.empty(case.calls)
+
+    for i in range(case.calls):
+        start = perf_counter_ns()
+        case.fn()
+        times[i] = perf_counter_ns() - start
+
+    # Allocations are measured separately: tracing slows every call down
+    tracemalloc.start()
+    peak = 0
+    for _ in range(min(case.calls, 20)):
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        case.fn()
+        _, call_peak = tracemalloc.get_traced_memory()
+        peak = max(peak, call_peak - base)
+    tracemalloc.stop()
+
+    us = times / 1000
+    p50, p90, p99 = np.percentile(us, (50, 90, 99))
+
+    return Result(
+        case.name,
+        case.params,
+        case.calls,
+        float(us.mean()),
+        float(p50),
+        float(p90),
+        float(p99),
+        float(us.max()),
+        peak,
+    )
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            cwd=ROOT,
+            stderr=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.decode().strip()
+
+
+def _int_list(s: str) -> list[int]:
+    return [int(x) for x in s.split(",") if x]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--sizes", type=_int_list, default=[60, 120, 240, 500, 1000])
+    parser.add_argument(
+        "--chunks", type=_int_list, default=[256, 512, 1024, 2048, 4096]
+    )
+    parser.add_argument("--filter", default="", help="Only run cases containing this")
+    parser.add_argument("--out", type=Path, default=None, help="Write JSON results")
+    parser.add_argument("--compare", type=Path, default=None, help="Previous results")
+    args = parser.parse_args()
+
+    baseline: dict[str, float] = {}
+    if args.compare is not None:
+        previous: dict[str, Any] = json.loads(args.compare.read_text())
+        baseline = {Result(**r).key: r["p50_us"] for r in previous["results"]}
+
+    results: list[Result] = []
+
+    print(f"{'case':<52} {'p50':>9} {'p99':>9} {'alloc':>9}", file=sys.stderr)  # noqa: T201
+
+    for case in cases(args.sizes, args.chunks):
+        if args.filter not in case.name:
+            continue
+
+        result = measure(case)
+        results.append(result)
+
+        line = (
+            f"{result.key:<52} {result.p50_us:>7.1f}us {result.p99_us:>7.1f}us"
+            f" {result.peak_alloc_bytes:>8}B"
+        )
+        if result.key in baseline:
+            line += f"  x{result.p50_us / baseline[result.key]:.2f}"
+        print(line, file=sys.stderr)  # noqa: T201
+
+    report = {
+        "commit": _git_commit(),
+        "date": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": [asdict(r) for r in results],
+    }
+
+    if args.out is not None:
+        args.out.write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
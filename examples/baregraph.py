@@ -1,17 +1,14 @@
+# Run the visualizer with `--stream-port 7778`
+
 import json
-from time import sleep
 from urllib import request
 
-import viravis.graph as graph
-
-
-def get(url: str) -> str:
-    with request.urlopen(url) as r:
-        return r.read().decode("utf-8")
+from viravis.graph import Graph
 
+canvas = Graph(20)
 
-while True:
-    r = get("http://127.0.0.1:7777")
-    data = json.loads(r).get("data")
-    graph.graph(data, 20, clear=True)
-    sleep(0.01)
+with request.urlopen("http://127.0.0.1:7778/events") as r:
+    for line in r:
+        if line.startswith(b"data: "):
+            data = json.loads(line.removeprefix(b"data: ")).get("data")
+            canvas.draw(data)
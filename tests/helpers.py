@@ -0,0 +1,17 @@
+import numpy as np
+
+
+class FakeAudio:
+    """Mono source whose band values are `[0, 1, ..., n - 1] * scale`"""
+
+    channels = 1
+    frame_rate = 44100 / 1024
+
+    def __init__(self, scale: float = 10) -> None:
+        self.scale = scale
+
+    def update(self) -> None:
+        pass
+
+    def get_values_np(self, n: int = 100, out: np.ndarray | None = None) -> np.ndarray:
+        return np.multiply(np.arange(n, dtype=float), self.scale, out=out)
@@ -0,0 +1,119 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pyaudio as pa
+
+from viravis.av_audio import Audio, decode_samples
+from viravis.devices import Devices
+
+
+class FakeStream:
+    """Blocking stream that raises `errors` before returning silence"""
+
+    def __init__(self, errors: list[OSError]) -> None:
+        self.errors = errors
+
+    def read(self, n: int) -> bytes:
+        if self.errors:
+            raise self.errors.pop(0)
+
+        return bytes(2 * n)
+
+    def stop_stream(self) -> None:
+        msg = "Stream is not open"
+        raise OSError(msg)
+
+    def close(self) -> None:
+        pass
+
+
+class FakeHost:
+    """PyAudio stand-in, input devices are named `names`"""
+
+    def __init__(self, errors: list[OSError], names: list[str]) -> None:
+        self.errors = errors
+        self.names = names
+
+    def get_device_count(self) -> int:
+        return len(self.names)
+
+    def get_device_info_by_index(self, i: int) -> dict[str, object]:
+        return {
+            "index": i,
+            "name": self.names[i],
+            "hostApi": 0,
+            "maxInputChannels": 1,
+            "maxOutputChannels": 0,
+            "defaultSampleRate": 44100.0,
+        }
+
+    def open(self, **_: object) -> FakeStream:
+        return FakeStream(self.errors)
+
+    def terminate(self) -> None:
+        pass
+
+
+def open_audio(errors: list[OSError], names: list[str]) -> Audio:
+    devices = Devices(lambda: FakeHost(errors, names))
+    devices.find(0)  # Read the device table
+
+    with mock.patch("viravis.av_audio.DEVICES", devices):
+        audio = Audio(chunk=4)
+
+    audio.device_index = len(names) - 1
+    audio.setup()
+    return audio
+
+
+class Test(unittest.TestCase):
+    def test_int16_mono_is_view(self) -> None:
+        data = np.array([0, 1, -2, 32767], np.int16).tobytes()
+        samples = decode_samples(data, pa.paInt16)
+        self.assertFalse(samples.flags.owndata)  # noqa: PT009
+        np.testing.assert_array_equal(samples, [0, 1, -2, 32767])
+
+    def test_float32_scale(self) -> None:
+        data = np.array([0.5, -1.0], np.float32).tobytes()
+        samples = decode_samples(data, pa.paFloat32)
+        np.testing.assert_allclose(samples, [16384, -32768])
+
+    def test_downmix(self) -> None:
+        data = np.array([100, 300, -50, 50, 7, 7], np.int16).tobytes()
+        samples = decode_samples(data, pa.paInt16, channels=2)
+        np.testing.assert_allclose(samples, [200, 0, 7])
+
+    def test_separate_channels(self) -> None:
+        data = np.array([100, 300, -50, 50, 7, 7], np.int16).tobytes()
+        samples = decode_samples(data, pa.paInt16, channels=2, downmix=False)
+        np.testing.assert_array_equal(samples, [[100, 300], [-50, 50], [7, 7]])
+
+    def test_blocking_overflow(self) -> None:
+        overflow = OSError(pa.paInputOverflowed, "Input overflowed")
+        audio = open_audio([overflow], ["Mic"])
+
+        # The late chunk is lost and counted, the stream is kept
+        self.assertIsNone(audio.read())  # noqa: PT009
+        self.assertEqual(audio.overruns, 1)  # noqa: PT009
+        np.testing.assert_array_equal(audio.read(), [0, 0, 0, 0])
+
+    def test_reconnect_backoff(self) -> None:
+        names = ["Speakers", "USB Mic"]
+        audio = open_audio([OSError(-9999, "Unanticipated host error")], names)
+
+        names.pop()  # Unplugged
+
+        with mock.patch("viravis.av_audio.sleep") as sleep:
+            self.assertIsNone(audio.read())  # noqa: PT009
+            self.assertIsNone(audio.read())  # noqa: PT009
+
+            names.append("USB Mic")
+            self.assertIsNone(audio.read())  # noqa: PT009
+
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [0.5, 1.0])  # noqa: PT009
+        np.testing.assert_array_equal(audio.read(), [0, 0, 0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+from viravis.analyzer import AnalyzerFFT
+from viravis.batch import analyze_fft, analyze_source, frame_matrix
+from viravis.source import ArraySource
+
+
+def signal(seconds: float = 2.0, rate: int = 44100) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * rate)) / rate
+    beat = np.sin(2 * np.pi * 2 * t) > 0
+    samples = np.sin(2 * np.pi * 440 * t) * 8000 * beat + rng.normal(0, 2000, t.size)
+    return samples.astype(np.int16)
+
+
+class Test(unittest.TestCase):
+    def test_frame_matrix(self) -> None:
+        samples = np.arange(10, dtype=np.int16)
+        frames = frame_matrix(samples, 4, 3)
+
+        expected = [[0, 1, 2, 3], [3, 4, 5, 6], [6, 7, 8, 9]]
+        np.testing.assert_array_equal(frames, expected)
+
+    def test_matches_streaming(self) -> None:
+        samples = signal()
+        source = ArraySource(samples, chunk=1024, hop=512)
+        self.assertEqual(len(analyze_source(source, 60)), len(source))  # noqa: PT009
+
+        for smoothing in (2, 1):
+            with self.subTest(smoothing=smoothing):
+                source = ArraySource(samples, chunk=1024, hop=512)
+                analyzer = AnalyzerFFT(60, source)
+                analyzer.smoothing = smoothing
+                data, mirrored = [], []
+
+                while True:
+                    analyzer.update()
+                    if source.finished:
+                        break
+                    frame = analyzer.publish()
+                    data.append(frame.data)
+                    mirrored.append(frame.mirrored)
+
+                batch = analyze_source(source, 60, smoothing=smoothing)
+
+                self.assertEqual(len(batch), len(data))  # noqa: PT009
+                np.testing.assert_array_equal(batch.mirrored, mirrored)
+                np.testing.assert_allclose(batch.data, data, rtol=1e-9)
+
+    def test_short_input(self) -> None:
+        batch = analyze_fft(np.zeros(100, np.int16), 60)
+
+        self.assertEqual(batch.data.shape, (0, 60))  # noqa: PT009
@@ -0,0 +1,133 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from viravis.analyzer import AnalyzerFFT, AnalyzerPulse
+from viravis.beat import BeatDetector
+from viravis.governor import Governor
+from viravis.scheduler import FrameScheduler
+from viravis.source import ArraySource
+
+RATE = 44100
+
+
+def clicks(bpm: float, seconds: float = 10.0) -> np.ndarray:
+    """Decaying 100 Hz bursts `bpm` times a minute, over faint noise"""
+
+    rng = np.random.default_rng(0)
+    samples = rng.normal(0, 200, int(seconds * RATE))
+
+    t = np.arange(2000)
+    burst = np.sin(2 * np.pi * 100 * t / RATE) * np.exp(-t / 400) * 20000
+
+    for start in range(0, len(samples) - len(t), int(RATE * 60 / bpm)):
+        samples[start : start + len(t)] += burst
+
+    return samples.astype(np.int16)
+
+
+def detect(samples: np.ndarray, hop: int = 512) -> tuple[BeatDetector, list[int]]:
+    source = ArraySource(samples, hop=hop)
+    detector = BeatDetector(source.frame_rate)
+    onsets = []
+
+    for frame in range(len(source)):
+        source.update()
+        if detector.push(source.magnitudes):
+            onsets.append(frame)
+
+    return detector, onsets
+
+
+class LatestSource(ArraySource):
+    """Live-like source: 512-sample hops, read 30 times a second"""
+
+    def __init__(self, samples: np.ndarray) -> None:
+        super().__init__(samples, hop=RATE // 30)
+
+    @property
+    def frame_rate(self) -> float:
+        return RATE / 512
+
+    @property
+    def live(self) -> bool:
+        return True
+
+
+class Test(unittest.TestCase):
+    def test_tempo(self) -> None:
+        for bpm in (70, 100, 128, 150):
+            with self.subTest(bpm=bpm):
+                detector, _ = detect(clicks(bpm))
+                self.assertAlmostEqual(detector.bpm, bpm, delta=2)  # noqa: PT009
+
+    def test_onsets_on_clicks(self) -> None:
+        _, onsets = detect(clicks(120))
+
+        # One onset per click (every 0.5 s = ~43 frames), right on it,
+        # after the first second (the threshold history)
+        period = RATE * 0.5 / 512
+        self.assertAlmostEqual(len(onsets), 17, delta=1)  # noqa: PT009
+        for onset in onsets:
+            beats = onset / period
+            self.assertLessEqual(abs(beats - round(beats)), 0.1)  # noqa: PT009
+
+    def test_steady_noise(self) -> None:
+        rng = np.random.default_rng(1)
+        noise = rng.normal(0, 3000, 5 * RATE).astype(np.int16)
+        _, onsets = detect(noise)
+
+        self.assertLess(len(onsets), 5)  # noqa: PT009
+
+    def test_fft_size_change(self) -> None:
+        detector = BeatDetector(86.0)
+        detector.push(np.ones(513))
+        detector.push(np.ones(129))  # Restarts the flux
+
+        self.assertEqual(detector.flux, 0)  # noqa: PT009
+
+    def test_frames_carry_beats(self) -> None:
+        source = ArraySource(clicks(120, seconds=8), hop=512)
+        analyzer = AnalyzerFFT(30, source, beat=BeatDetector(source.frame_rate))
+        beats = 0
+
+        for _ in range(len(source)):
+            analyzer.update()
+            beats += analyzer.publish().beat
+
+        self.assertAlmostEqual(beats, 13, delta=1)  # noqa: PT009
+        self.assertAlmostEqual(analyzer.frame.bpm, 120, delta=2)  # noqa: PT009
+
+    def test_governed_rate(self) -> None:
+        source = LatestSource(clicks(120))
+        detector = BeatDetector(source.frame_rate)
+        analyzer = AnalyzerPulse(10, source, beat=detector)
+        governor = Governor(analyzer, target_fps=30)
+
+        # Skipping hops, the analyzer sees 30 frames a second
+        self.assertEqual(detector.frame_rate, 30)  # noqa: PT009
+        self.assertAlmostEqual(analyzer.fade, 0.5 ** (1 / 3))  # noqa: PT009
+
+        with mock.patch.object(FrameScheduler, "wait"):
+            while not source.finished:
+                governor.wait()
+                analyzer.update()
+
+        self.assertAlmostEqual(detector.bpm, 120, delta=3)  # noqa: PT009
+
+    def test_pulse(self) -> None:
+        analyzer = AnalyzerPulse(10, ArraySource(clicks(120, seconds=4), hop=512))
+        values = []
+
+        for _ in range(140):
+            analyzer.update()
+            values.append(analyzer.get_data().max())
+
+        # Flashes on a click, then fades out
+        self.assertEqual(max(values), 255)  # noqa: PT009
+        self.assertLess(values[-1], 255)  # noqa: PT009
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+
+from viravis.protocol import (
+    SYNC_DELTA,
+    DeltaDecoder,
+    DeltaEncoder,
+    FrameError,
+    encode_binary,
+)
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(1)
+        frame = rng.integers(0, 256, 600).astype(float)
+        self.frames = [frame.copy()]
+
+        for _ in range(120):
+            # Change a few short segments per frame
+            for start in rng.integers(0, 590, 4):
+                frame[start : start + rng.integers(1, 10)] = rng.integers(0, 256)
+            self.frames.append(frame.copy())
+
+    def test_round_trip(self) -> None:
+        encoder = DeltaEncoder(keyframe_interval=30)
+        decoder = DeltaDecoder()
+
+        for frame in self.frames:
+            np.testing.assert_array_equal(decoder.decode(encoder.encode(frame)), frame)
+
+    def test_smaller_than_full_frames(self) -> None:
+        encoder = DeltaEncoder()
+        delta = sum(len(encoder.encode(f)) for f in self.frames)
+        full = sum(len(encode_binary(f)) for f in self.frames)
+        self.assertLess(delta, full / 4)  # noqa: PT009
+
+    def test_threshold(self) -> None:
+        encoder = DeltaEncoder(threshold=4)
+        decoder = DeltaDecoder()
+        rng = np.random.default_rng(2)
+        frame = np.full(100, 128.0)
+
+        for _ in range(200):
+            frame = np.clip(frame + rng.normal(0, 2, frame.shape), 0, 255)
+            decoded = decoder.decode(encoder.encode(frame))
+            # Error stays bounded, it doesn't accumulate
+            self.assertLessEqual(np.abs(decoded - np.rint(frame)).max(), 4)  # noqa: PT009
+
+    def test_long_run_and_resize(self) -> None:
+        encoder = DeltaEncoder()
+        decoder = DeltaDecoder()
+
+        for frame in (np.zeros(1000), np.full(1000, 9.0), np.zeros(10)):
+            np.testing.assert_array_equal(decoder.decode(encoder.encode(frame)), frame)
+
+    def test_unchanged(self) -> None:
+        encoder = DeltaEncoder()
+        encoder.encode(np.arange(100))
+        frame = encoder.encode(np.arange(100))
+        self.assertTrue(frame.startswith(SYNC_DELTA))  # noqa: PT009
+        self.assertEqual(len(frame), 7)  # noqa: PT009  (header, 'D', CRC)
+
+    def test_delta_before_keyframe(self) -> None:
+        encoder = DeltaEncoder()
+        encoder.encode(np.zeros(100))
+        delta = encoder.encode(np.r_[1.0, np.zeros(99)])
+
+        with self.assertRaises(FrameError):  # noqa: PT027
+            DeltaDecoder().decode(delta)
+
+
+if __name__ == "__main__":
+    unittest.main()
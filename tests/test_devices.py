@@ -0,0 +1,118 @@
+import re
+import unittest
+from typing import Any
+from unittest import mock
+
+from viravis.devices import Devices, Query, parse_query
+
+INFOS: list[dict[str, Any]] = [
+    {"name": "Speakers", "maxInputChannels": 0},
+    {"name": "USB Audio Interface", "maxInputChannels": 2},
+    {"name": "Monitor of Speakers", "maxInputChannels": 2},
+]
+
+
+class FakeHost:
+    """PyAudio stand-in that counts the calls"""
+
+    created = 0
+
+    def __init__(self, infos: list[dict[str, Any]] = INFOS) -> None:
+        FakeHost.created += 1
+
+        self.infos = infos
+        self.info_calls = 0
+        self.format_calls = 0
+        self.terminated = False
+
+    def get_device_count(self) -> int:
+        return len(self.infos)
+
+    def get_device_info_by_index(self, i: int) -> dict[str, Any]:
+        self.info_calls += 1
+        return {
+            "index": i,
+            "hostApi": 0,
+            "maxOutputChannels": 2,
+            "defaultSampleRate": 48000.0,
+            **self.infos[i],
+        }
+
+    def is_format_supported(self, rate: int, **_: object) -> bool:
+        self.format_calls += 1
+
+        if rate not in (44100, 48000):
+            msg = "Invalid sample rate"
+            raise ValueError(msg)
+
+        return True
+
+    def terminate(self) -> None:
+        self.terminated = True
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        FakeHost.created = 0
+        self.devices = Devices(FakeHost)
+
+    def index(self, query: Query, *, input_: bool = True) -> int | None:
+        device = self.devices.find(query, input_=input_)
+        return None if device is None else device.index
+
+    def test_find(self) -> None:
+        self.assertEqual(self.index("USB"), 1)  # noqa: PT009
+        monitor = re.compile("^monitor", re.IGNORECASE)
+        self.assertEqual(self.index(monitor), 2)  # noqa: PT009
+        self.assertEqual(self.index(2), 2)  # noqa: PT009
+
+        # Output only
+        self.assertIsNone(self.index(0))  # noqa: PT009
+        self.assertEqual(self.index("Speakers", input_=False), 0)  # noqa: PT009
+
+        # One instance, every device read once
+        self.assertEqual(FakeHost.created, 1)  # noqa: PT009
+        self.assertEqual(self.devices.host.info_calls, len(INFOS))  # noqa: PT009
+
+    def test_parse_query(self) -> None:
+        self.assertEqual(parse_query("3"), 3)  # noqa: PT009
+        self.assertEqual(parse_query("Stereo Mix"), "Stereo Mix")  # noqa: PT009
+        pattern = parse_query("/usb.*interface/")
+        self.assertIsInstance(pattern, re.Pattern)  # noqa: PT009
+        self.assertEqual(self.index(pattern), 1)  # noqa: PT009
+
+    def test_rates_cached(self) -> None:
+        device = self.devices.find("USB")
+        self.assertIsNotNone(device)  # noqa: PT009
+
+        self.assertEqual(self.devices.rates(device), [44100, 48000])  # noqa: PT009
+        calls = self.devices.host.format_calls
+        self.devices.rates(device)
+        self.assertEqual(self.devices.host.format_calls, calls)  # noqa: PT009
+
+    def test_rescan(self) -> None:
+        old = self.devices.host
+        self.devices.rescan()
+
+        self.assertTrue(old.terminated)  # noqa: PT009
+        self.assertIsNot(self.devices.host, old)  # noqa: PT009
+
+    def test_hotplug(self) -> None:
+        infos = INFOS[:2]
+        devices = Devices(lambda: FakeHost(infos))
+
+        with mock.patch("viravis.devices._hotplug_token", return_value="a"):
+            self.assertIsNone(devices.find("Monitor"))  # noqa: PT009
+
+        # No change: a miss doesn't rescan
+        with mock.patch("viravis.devices._hotplug_token", return_value="a"):
+            infos.append(INFOS[2])
+            self.assertIsNone(devices.find("Monitor"))  # noqa: PT009
+
+        # Devices changed: rescanned on the miss
+        with mock.patch("viravis.devices._hotplug_token", return_value="b"):
+            self.assertIsNotNone(devices.find("Monitor"))  # noqa: PT009
+
+
+if __name__ == "__main__":
+    unittest.main()
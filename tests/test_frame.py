@@ -0,0 +1,44 @@
+import unittest
+from threading import Thread
+
+import numpy as np
+from helpers import FakeAudio
+
+from viravis.analyzer import AnalyzerFFT
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.analyzer = AnalyzerFFT(10, FakeAudio())  # type: ignore[arg-type]
+
+    def test_publish(self) -> None:
+        self.analyzer.update()
+        frame = self.analyzer.publish()
+
+        self.assertIs(self.analyzer.frame, frame)  # noqa: PT009
+        self.assertEqual(frame.index, 1)  # noqa: PT009
+        np.testing.assert_array_equal(frame.mirrored, self.analyzer.get_data_mirrored())
+        self.assertFalse(frame.mirrored.flags.writeable)  # noqa: PT009
+
+        # Later updates don't touch published frames
+        mirrored = frame.mirrored.copy()
+        self.analyzer.update()
+        np.testing.assert_array_equal(frame.mirrored, mirrored)
+
+    def test_wait_frame(self) -> None:
+        self.assertEqual(self.analyzer.wait_frame(0, timeout=0.01).index, 0)  # noqa: PT009
+
+        def produce() -> None:
+            self.analyzer.update()
+            self.analyzer.publish()
+
+        thread = Thread(target=produce)
+        thread.start()
+        frame = self.analyzer.wait_frame(0, timeout=5)
+        thread.join()
+
+        self.assertEqual(frame.index, 1)  # noqa: PT009
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from time import thread_time
+from unittest import mock
+
+import numpy as np
+
+from viravis.analyzer import AnalyzerFFT
+from viravis.governor import DEFAULT_LADDER, Governor
+from viravis.scheduler import FrameScheduler
+from viravis.service import VAudioService
+from viravis.source import ArraySource
+
+
+def signal(seconds: float = 1.0, rate: int = 44100) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.normal(0, 3000, int(seconds * rate)).astype(np.int16)
+
+
+class LoadedAnalyzer(AnalyzerFFT):
+    """Burns `extra` seconds of CPU time per update"""
+
+    extra: float = 0.0
+
+    def update(self) -> None:
+        end = thread_time() + self.extra
+        while thread_time() < end:
+            pass
+
+        super().update()
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        source = ArraySource(signal(), chunk=1024, hop=512, loop=True)
+        self.analyzer = LoadedAnalyzer(60, source)
+        self.service = VAudioService(self.analyzer)
+        self.governor = Governor(
+            self.analyzer, [self.service], target_fps=100, cpu_budget=0.5, window=5
+        )
+
+    def run_frames(self, n: int) -> None:
+        for _ in range(n):
+            self.governor.wait()
+            with self.governor.measure():
+                self.analyzer.update()
+                self.analyzer.publish()
+
+    def test_steps_down_under_load_and_back_up(self) -> None:
+        self.run_frames(10)
+        self.assertEqual(self.governor.level, 0)  # noqa: PT009
+
+        self.analyzer.extra = 0.008  # 80% of the frame interval
+        self.run_frames(5 * len(DEFAULT_LADDER))
+
+        cheapest = DEFAULT_LADDER[-1]
+        self.assertEqual(self.governor.level, len(DEFAULT_LADDER) - 1)  # noqa: PT009
+        self.assertEqual(self.analyzer.audio.fft_size, 1024 // cheapest.fft_divisor)  # noqa: PT009
+        self.assertEqual(self.analyzer.smoothing, cheapest.smoothing)  # noqa: PT009
+        self.assertEqual(self.service.send_interval, cheapest.send_interval)  # noqa: PT009
+        self.assertEqual(self.governor.fps, 100 / cheapest.rate_divisor)  # noqa: PT009
+        self.assertTrue(  # noqa: PT009
+            all(d.reason == "over CPU budget" for d in self.governor.decisions)
+        )
+
+        self.analyzer.extra = 0.0
+        self.run_frames(5 * len(DEFAULT_LADDER) + 5)
+
+        self.assertEqual(self.governor.level, 0)  # noqa: PT009
+        self.assertEqual(self.analyzer.audio.fft_size, 1024)  # noqa: PT009
+        self.assertEqual(self.governor.decisions[-1].reason, "headroom")  # noqa: PT009
+
+    def test_smaller_fft_keeps_scale(self) -> None:
+        t = np.arange(44100) / 44100
+        tone = (np.sin(2 * np.pi * 1000 * t) * 16000).astype(np.int16)
+        source = ArraySource(tone, chunk=1024)
+
+        source.update()
+        full = source.get_values_np(60).max()
+
+        source.fft_size = 256
+        source.update()
+        reduced = source.get_values_np(60).max()
+
+        # The window gain is normalized: a tone keeps its level
+        self.assertAlmostEqual(reduced / full, 1.0, delta=0.2)  # noqa: PT009
+
+    def test_blocking_source_keeps_its_rate(self) -> None:
+        source = ArraySource(signal(), chunk=1024, paced=True)
+        governor = Governor(AnalyzerFFT(60, source), target_fps=10)
+
+        self.assertEqual(governor.fps, source.frame_rate)  # noqa: PT009
+
+        # Reading paces the loop: waiting more would fall behind
+        with mock.patch.object(FrameScheduler, "wait") as wait:
+            governor.wait()
+
+        wait.assert_not_called()
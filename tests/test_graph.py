@@ -0,0 +1,42 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from viravis.graph import Graph, graph
+
+
+class Test(unittest.TestCase):
+    def test_graph(self) -> None:
+        out = io.StringIO()
+        with redirect_stdout(out):
+            graph((x for x in [0, 1, 3, 2.5]), 3)
+
+        self.assertEqual(out.getvalue(), "░░▉░\n░░▉▉\n░▉▉▉\n")  # noqa: PT009
+
+    def test_eighths(self) -> None:
+        rows = Graph(2).render(np.array([0.5, 1.25, 2.0, 9.0]))
+        self.assertEqual(rows, " ▂██\n▄███\n")  # noqa: PT009
+
+    def test_nan(self) -> None:
+        rows = Graph(2).render(np.array([np.nan, 1.0, np.inf]))
+        self.assertEqual(rows, "  █\n ██\n")  # noqa: PT009
+
+    def test_only_changed_rows(self) -> None:
+        canvas = Graph(3, eighths=False)
+        canvas.render([1, 2, 3])
+
+        self.assertEqual(canvas.render([1, 2, 3]), "")  # noqa: PT009
+
+        # Only the top row changes: up 3 lines, redraw, back down 3
+        self.assertEqual(  # noqa: PT009
+            canvas.render([1, 2, 2]), "\x1b[3F░░░\x1b[K\x1b[3E"
+        )
+
+        canvas.reset()
+        self.assertEqual(canvas.render([0]), "░\n░\n░\n")  # noqa: PT009
+
+
+if __name__ == "__main__":
+    unittest.main()
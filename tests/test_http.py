@@ -0,0 +1,42 @@
+import unittest
+from typing import Any
+
+from helpers import FakeAudio
+
+from viravis.analyzer import AnalyzerFFT
+from viravis.metrics import CONTENT_TYPE
+from viravis.vaudio import VAudioHttpServer
+
+
+class FakeResponse:
+    def __init__(self) -> None:
+        self.headers: dict[str, str] = {}
+        self.sent: list[tuple[Any, dict[str, str]]] = []  # Body, headers
+
+    def send(self, body: Any) -> None:  # noqa: ANN401
+        self.sent.append((body, dict(self.headers)))
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        analyzer = AnalyzerFFT(4, FakeAudio())  # type: ignore[arg-type]
+        self.server = VAudioHttpServer(analyzer)
+
+    def test_metrics(self) -> None:
+        res = FakeResponse()
+        self.server.serve_metrics(None, res)  # type: ignore[arg-type]
+
+        [(body, headers)] = res.sent
+        self.assertEqual(headers["Content-Type"], CONTENT_TYPE)  # noqa: PT009
+        self.assertIn("# TYPE viravis_http_requests_total counter", body)  # noqa: PT009
+
+    def test_data(self) -> None:
+        res = FakeResponse()
+        self.server.serve_data(None, res)  # type: ignore[arg-type]
+
+        [(body, _)] = res.sent
+        self.assertEqual(len(body["data"]), 8)  # noqa: PT009
+
+
+if __name__ == "__main__":
+    unittest.main()
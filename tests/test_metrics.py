@@ -0,0 +1,55 @@
+import unittest
+
+from viravis.metrics import Histogram, Metrics
+
+
+class Test(unittest.TestCase):
+    def test_disabled_timer_records_nothing(self) -> None:
+        metrics = Metrics()
+
+        with metrics.time("analysis"):
+            pass
+
+        self.assertEqual(metrics.render(), "\n")  # noqa: PT009
+
+    def test_histogram_buckets(self) -> None:
+        histogram = Histogram((0.1, 1.0))
+
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.counts, [2, 1, 1])  # noqa: PT009
+        self.assertEqual(histogram.count, 4)  # noqa: PT009
+        self.assertAlmostEqual(histogram.sum, 2.65)  # noqa: PT009
+
+    def test_render(self) -> None:
+        metrics = Metrics("test")
+        metrics.enabled = True
+
+        metrics.counter("frames_total", "Frames").inc(3)
+        metrics.counter_fn("overruns_total", lambda: 2, "Overruns")
+        metrics.gauge("tempo_bpm", lambda: 120.0, "Tempo")
+
+        with metrics.time("fft"):
+            pass
+
+        lines = metrics.render().splitlines()
+
+        self.assertIn("# TYPE test_frames_total counter", lines)  # noqa: PT009
+        self.assertIn("test_frames_total 3", lines)  # noqa: PT009
+        self.assertIn("# TYPE test_overruns_total counter", lines)  # noqa: PT009
+        self.assertIn("test_overruns_total 2", lines)  # noqa: PT009
+        self.assertIn("# TYPE test_tempo_bpm gauge", lines)  # noqa: PT009
+        self.assertIn("# TYPE test_stage_seconds histogram", lines)  # noqa: PT009
+        self.assertIn(  # noqa: PT009
+            'test_stage_seconds_bucket{stage="fft",le="+Inf"} 1', lines
+        )
+        self.assertIn('test_stage_seconds_count{stage="fft"} 1', lines)  # noqa: PT009
+
+        # Buckets are cumulative
+        buckets = [
+            int(line.rsplit(" ", 1)[1])
+            for line in lines
+            if line.startswith("test_stage_seconds_bucket")
+        ]
+        self.assertEqual(buckets, sorted(buckets))  # noqa: PT009
@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+from helpers import FakeAudio
+
+from viravis.analyzer import AnalyzerFFT
+from viravis.normalize import Normalizer, SlidingMax
+
+
+class Test(unittest.TestCase):
+    def test_sliding_max(self) -> None:
+        rng = np.random.default_rng(0)
+        values = rng.random(300).tolist()
+        sliding = SlidingMax(7)
+
+        for i, v in enumerate(values):
+            sliding.push(v)
+            self.assertEqual(sliding.max, max(values[max(i - 6, 0) : i + 1]))  # noqa: PT009
+
+    def test_mean(self) -> None:
+        normalizer = Normalizer(window=4)
+
+        for peak in (8.0, 4.0, 0.5):
+            normalizer.push(peak)
+
+        # The window starts out empty (zeros), low peaks count as the floor
+        self.assertEqual(normalizer.level, (8 + 4 + 1) / 4)  # noqa: PT009
+
+    def test_max_with_decay(self) -> None:
+        normalizer = Normalizer(window=2, statistic="max", decay=0.5)
+
+        self.assertEqual(normalizer.push(100.0), 100)  # noqa: PT009
+        self.assertEqual(normalizer.push(1.0), 100)  # noqa: PT009
+        # The peak left the window: the level falls by the decay only
+        self.assertEqual(normalizer.push(1.0), 50)  # noqa: PT009
+        self.assertEqual(normalizer.push(1.0), 25)  # noqa: PT009
+
+    def test_bad_decay(self) -> None:
+        with self.assertRaises(ValueError):  # noqa: PT027
+            Normalizer(decay=1.5)
+
+    def test_analyzer_level_settles(self) -> None:
+        for normalizer in (
+            Normalizer(window=10),
+            Normalizer(window=10, statistic="max", decay=0.95),
+        ):
+            analyzer = AnalyzerFFT(30, FakeAudio(50.0), normalizer)  # type: ignore[arg-type]
+
+            for _ in range(400):
+                analyzer.update()
+
+            # Peaks are normalized by the level itself: with a steady
+            # input the level settles where it equals the output peak
+            self.assertAlmostEqual(  # noqa: PT009
+                analyzer.level / analyzer.get_peak(), 1.0, delta=0.05
+            )
@@ -0,0 +1,40 @@
+import unittest
+
+import numpy as np
+
+from viravis.protocol import SYNC, FrameError, decode_binary, encode_binary
+from viravis.vaudio import _stringify_serial  # type: ignore[reportPrivateUsage]
+
+
+class Test(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        arr = np.array([0, 1.4, 2.6, 255, 300, -5, np.nan])
+        frame = encode_binary(arr)
+
+        self.assertTrue(frame.startswith(SYNC))  # noqa: PT009
+        np.testing.assert_array_equal(decode_binary(frame), [0, 1, 3, 255, 255, 0, 0])
+
+    def test_corrupted(self) -> None:
+        frame = bytearray(encode_binary(np.arange(10)))
+        frame[6] ^= 0xFF
+
+        with self.assertRaises(FrameError):  # noqa: PT027
+            decode_binary(bytes(frame))
+
+    def test_size(self) -> None:
+        """Binary frames are less than half the size of text ones
+
+        (Encoding times are compared by benchmarks/hotpaths.py)
+        """
+
+        rng = np.random.default_rng(0)
+        arr = rng.random(480) * 255
+
+        text = _stringify_serial(arr).encode()
+        binary = encode_binary(arr)
+
+        self.assertLess(len(binary), len(text) / 2)  # noqa: PT009
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from viravis.analyzer import AnalyzerFFT
+from viravis.registry import ANALYZERS, Registry
+
+ROOT = Path(__file__).parent.parent
+
+HEAVY = ("pyaudio", "saaba", "serial")
+
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+    """Own and cumulative import time (us) of every module `module` imports"""
+
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines()[1:]:  # After the header
+        own, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+
+    return times
+
+
+class Test(unittest.TestCase):
+    def test_no_heavy_imports(self) -> None:
+        times = import_times("viravis.vaudio")
+
+        self.assertIn("viravis.vaudio", times)  # noqa: PT009
+        for module in HEAVY:
+            self.assertNotIn(module, times)  # noqa: PT009
+
+        # Relative to NumPy, so it doesn't depend on the machine
+        own = sum(t for name, (t, _) in times.items() if name.startswith("viravis"))
+        self.assertLess(own, times["numpy"][1])  # noqa: PT009
+
+    def test_builtin(self) -> None:
+        self.assertIs(ANALYZERS.load("fft"), AnalyzerFFT)  # noqa: PT009
+        self.assertIn("pulse", ANALYZERS.names())  # noqa: PT009
+
+        with self.assertRaises(ValueError):  # noqa: PT027
+            ANALYZERS.load("nope")
+
+    def test_entry_points(self) -> None:
+        with tempfile.TemporaryDirectory() as d:
+            info = Path(d) / "viravis_plugin-1.0.dist-info"
+            info.mkdir()
+            (info / "METADATA").write_text("Name: viravis-plugin\nVersion: 1.0\n")
+            (info / "entry_points.txt").write_text(
+                "[viravis.test]\n"
+                "fft = viravis.analyzer:AnalyzerRolling\n"
+                "tone = viravis.analyzer:AnalyzerFlat\n"
+            )
+
+            sys.path.insert(0, d)
+            try:
+                registry = Registry(
+                    "viravis.test", {"fft": "viravis.analyzer:AnalyzerFFT"}
+                )
+                names = registry.names()
+            finally:
+                sys.path.remove(d)
+
+        self.assertEqual(names, ["fft", "tone"])  # noqa: PT009
+        self.assertEqual(registry.plugins(), ["tone"])  # noqa: PT009
+        # Built-ins are not replaced
+        self.assertIs(registry.load("fft"), AnalyzerFFT)  # noqa: PT009
+        self.assertEqual(registry.load("tone").__name__, "AnalyzerFlat")  # noqa: PT009
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+from viravis.ring import RingBuffer, SampleRing
+
+
+class Test(unittest.TestCase):
+    def test_read_before_full(self) -> None:
+        ring = SampleRing(8)
+        ring.write(np.array([1.0, 2.0, 3.0]))
+
+        out = np.empty(5)
+        self.assertEqual(ring.read_latest(out), 3)  # noqa: PT009
+        np.testing.assert_array_equal(out, [0, 0, 1, 2, 3])
+
+    def test_wrap(self) -> None:
+        ring = SampleRing(8)
+        for start in range(0, 30, 3):
+            ring.write(np.arange(start, start + 3, dtype=float))
+
+        out = np.empty(6)
+        self.assertEqual(ring.read_latest(out), 30)  # noqa: PT009
+        np.testing.assert_array_equal(out, np.arange(24, 30))
+
+    def test_channels(self) -> None:
+        ring = SampleRing(4, channels=2)
+        ring.write(np.arange(10, dtype=float).reshape(5, 2))
+        ring.write(np.array([[10.0, 11.0]]))
+
+        out = np.empty((3, 2))
+        self.assertEqual(ring.read_latest(out), 6)  # noqa: PT009
+        np.testing.assert_array_equal(out, [[6, 7], [8, 9], [10, 11]])
+
+    def test_block_larger_than_capacity(self) -> None:
+        ring = SampleRing(4)
+        ring.write(np.arange(10, dtype=float))
+
+        out = np.empty(4)
+        self.assertEqual(ring.read_latest(out), 10)  # noqa: PT009
+        np.testing.assert_array_equal(out, [6, 7, 8, 9])
+
+    def test_ring_buffer_mean(self) -> None:
+        ring = RingBuffer(4)
+        values = [3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0, 5.0]
+
+        for i, v in enumerate(values):
+            ring.push(v)
+            window = values[max(i - 3, 0) : i + 1]
+            self.assertAlmostEqual(ring.mean, sum(window) / 4)  # noqa: PT009
+            self.assertEqual(ring.last, v)  # noqa: PT009
+
+        np.testing.assert_array_equal(ring.array(), [5, 6, 2, 9])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from threading import Thread
+from time import monotonic, sleep
+
+import numpy as np
+from helpers import FakeAudio
+
+from viravis.analyzer import AnalyzerFFT
+from viravis.frame import Frame
+from viravis.protocol import decode_binary
+from viravis.router import OutputSpec, Segment, load_outputs
+from viravis.vaudio import VAudioSerial
+
+
+def make_frame(values: np.ndarray) -> Frame:
+    return Frame.create(1, values, np.concatenate((np.flip(values), values)))
+
+
+class Test(unittest.TestCase):
+    def test_identity(self) -> None:
+        values = np.arange(10, dtype=float)
+        segment = Segment(OutputSpec("loop://", 10))
+        frame = make_frame(values)
+        np.testing.assert_allclose(segment(frame), frame.mirrored)
+
+    def test_slice_and_resample(self) -> None:
+        values = np.arange(11, dtype=float)  # 0..10
+        segment = Segment(OutputSpec("loop://", 3, start=0.5, end=1.0, mirror=False))
+        np.testing.assert_allclose(segment(make_frame(values)), [5, 7.5, 10])
+
+    def test_load_outputs(self) -> None:
+        config = {
+            "outputs": [
+                {"port": "loop://", "size": 30, "end": 0.5},
+                {"port": "loop://", "size": 60, "start": 0.5, "mirror": False},
+            ]
+        }
+
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "outputs.json"
+            path.write_text(json.dumps(config))
+            specs = load_outputs(path)
+
+        self.assertEqual(specs[1], OutputSpec("loop://", 60, 0.5, 1.0, mirror=False))  # noqa: PT009
+
+        for bad in (
+            {"start": 0.7, "end": 0.2},
+            {"size": 0},
+            {"serial_format": "bin"},
+        ):
+            with self.subTest(bad), self.assertRaises(ValueError):  # noqa: PT027
+                OutputSpec.from_dict({"port": "x", "size": 1, **bad})
+
+    def test_fan_out(self) -> None:
+        analyzer = AnalyzerFFT(20, FakeAudio(2))  # type: ignore[arg-type]
+        specs = [
+            OutputSpec("loop://", 5, end=0.5, serial_format="binary"),
+            OutputSpec("loop://", 8, start=0.5, serial_format="binary", mirror=False),
+        ]
+        services = [
+            VAudioSerial(analyzer, s.port, s.serial_format, "frame", Segment(s))
+            for s in specs
+        ]
+        threads = [Thread(target=s.run, daemon=True) for s in services]
+
+        for t in threads:
+            t.start()
+
+        while any(s.port is None for s in services):
+            sleep(0.01)
+
+        analyzer.update()
+        frame = analyzer.publish()
+
+        for spec, service in zip(specs, services, strict=True):
+            expected = np.rint(np.clip(Segment(spec)(frame), 0, 255))
+            length = (2 if spec.mirror else 1) * spec.size + 6
+
+            port = service.port._port  # type: ignore[union-attr]  # noqa: SLF001
+            port.timeout = 0.5
+            data = b""
+            deadline = monotonic() + 5
+            while len(data) < length and monotonic() < deadline:
+                data += port.read(port.in_waiting or 1)
+
+            np.testing.assert_array_equal(decode_binary(data), expected)
+
+        for s in services:
+            s.stop()
+        for t in threads:
+            t.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from time import monotonic, sleep
+
+from viravis.scheduler import FrameScheduler
+
+
+class Test(unittest.TestCase):
+    def test_no_drift(self) -> None:
+        # Ticks long enough that scheduling jitter doesn't skip one
+        scheduler = FrameScheduler(0.02)
+        scheduler.wait()
+        start = monotonic()
+
+        for _ in range(10):
+            sleep(0.004)  # Work done between ticks
+            scheduler.wait()
+
+        self.assertAlmostEqual(monotonic() - start, 0.2, delta=0.03)  # noqa: PT009
+        self.assertEqual(scheduler.missed, 0)  # noqa: PT009
+
+    def test_skip_missed_ticks(self) -> None:
+        scheduler = FrameScheduler(0.01)
+        scheduler.wait()
+        sleep(0.055)
+        scheduler.wait()
+
+        self.assertGreaterEqual(scheduler.missed, 3)  # noqa: PT009
+
+        # Back on schedule, no burst of immediate ticks
+        start = monotonic()
+        scheduler.wait()
+        self.assertGreater(monotonic() - start, 0.001)  # noqa: PT009
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import multiprocessing
+import socket
+import threading
+import unittest
+from functools import partial
+from time import monotonic
+
+import numpy as np
+
+from viravis.frame import Frame
+from viravis.protocol import decode_binary
+from viravis.shared import FrameReader, SharedFrames, start_service
+from viravis.udp import VAudioUdp
+
+
+def frame(index: int, size: int = 4) -> Frame:
+    data = np.full(size, index, float)
+    return Frame.create(index, data, np.concatenate((data, data)) * 2)
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.frames = SharedFrames(4)
+
+    def tearDown(self) -> None:
+        self.frames.close()
+
+    def test_roundtrip(self) -> None:
+        self.frames.write(frame(7))
+
+        seq, copy = self.frames.read()
+
+        self.assertEqual(seq, 1)  # noqa: PT009
+        self.assertEqual(copy.index, 7)  # noqa: PT009
+        np.testing.assert_array_equal(copy.data, [7, 7, 7, 7])
+        np.testing.assert_array_equal(copy.mirrored, [14] * 8)
+        self.assertFalse(copy.mirrored.flags.writeable)  # noqa: PT009
+
+    def test_channels(self) -> None:
+        stereo = SharedFrames(4, channels=2)
+        data = np.arange(8, dtype=float).reshape(2, 4)
+
+        try:
+            stereo.write(Frame.create(1, data, np.arange(8, dtype=float)))
+            _, copy = stereo.read()
+            np.testing.assert_array_equal(copy.data, data)
+            np.testing.assert_array_equal(copy.mirrored, np.arange(8))
+        finally:
+            stereo.close()
+
+    def test_beat(self) -> None:
+        data = np.zeros(4)
+        self.frames.write(Frame.create(2, data, np.zeros(8), beat=True, bpm=128.5))
+
+        _, copy = self.frames.read()
+        self.assertTrue(copy.beat)  # noqa: PT009
+        self.assertEqual(copy.bpm, 128.5)  # noqa: PT009
+
+    def test_failed_write_keeps_frame(self) -> None:
+        self.frames.write(frame(1))
+
+        with self.assertRaises(ValueError):  # Wrong size  # noqa: PT027
+            self.frames.write(frame(2, size=3))
+
+        seq, copy = self.frames.read()
+        self.assertEqual(seq, 1)  # noqa: PT009
+        self.assertEqual(copy.index, 1)  # noqa: PT009
+        np.testing.assert_array_equal(copy.data, [1, 1, 1, 1])
+
+    def test_attach_requires_condition(self) -> None:
+        with self.assertRaises(ValueError):  # noqa: PT027
+            SharedFrames(4, self.frames.name)
+
+    def test_reader(self) -> None:
+        reader = FrameReader(self.frames.name, 4, self.frames.condition)
+
+        try:
+            self.assertEqual(reader.wait_frame(0, timeout=0.01).index, 0)  # noqa: PT009
+
+            self.frames.write(frame(3))
+            self.assertEqual(reader.wait_frame(0, timeout=1).index, 3)  # noqa: PT009
+
+            # Woken up by the writer, well before the timeout
+            writer = threading.Timer(0.05, self.frames.write, (frame(4),))
+            writer.start()
+            start = monotonic()
+            self.assertEqual(reader.wait_frame(3, timeout=5).index, 4)  # noqa: PT009
+            self.assertLess(monotonic() - start, 2)  # noqa: PT009
+            writer.join()
+
+            self.assertIs(reader.frame, reader.frame)  # Cached  # noqa: PT009
+        finally:
+            reader.close()
+
+    def test_service_process(self) -> None:
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.bind(("127.0.0.1", 0))
+        receiver.settimeout(5)
+
+        stop = multiprocessing.Event()
+        factory = partial(
+            VAudioUdp,
+            destinations=[receiver.getsockname()],
+            protocol="raw",
+            sync="frame",
+        )
+        process = start_service(self.frames, factory, stop)
+
+        try:
+            # Keep publishing until the service is up
+            for index in range(1, 500):
+                self.frames.write(frame(index))
+                try:
+                    data, _ = receiver.recvfrom(2048)
+                    break
+                except TimeoutError:
+                    continue
+
+            values = decode_binary(data)
+            self.assertEqual(values.size, 8)  # noqa: PT009
+            self.assertTrue(np.all(values == values[0]))  # noqa: PT009
+        finally:
+            stop.set()
+            process.join(timeout=5)
+            receiver.close()
+
+        self.assertFalse(process.is_alive())  # noqa: PT009
@@ -0,0 +1,76 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from viravis.analyzer import AnalyzerFFT, AnalyzerRolling
+from viravis.protocol import to_uint8
+from viravis.show import Show, ShowError, ShowPlayer, render, write_show
+from viravis.source import ArraySource
+
+
+def signal(seconds: float = 1.0, rate: int = 44100) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * rate)) / rate
+    samples = np.sin(2 * np.pi * 440 * t) * 8000 + rng.normal(0, 2000, t.size)
+    return samples.astype(np.int16)
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = Path(self._dir.name) / "track.show"
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def _streamed(self, cls: type, samples: np.ndarray) -> list[np.ndarray]:
+        analyzer = cls(30, ArraySource(samples, hop=512))
+        frames = []
+
+        while True:
+            analyzer.update()
+            if analyzer.audio.finished:
+                return frames
+            frames.append(to_uint8(analyzer.publish().mirrored))
+
+    def test_render_matches_streaming(self) -> None:
+        samples = signal()
+
+        for cls in (AnalyzerFFT, AnalyzerRolling):
+            with self.subTest(cls=cls.__name__):
+                n = render(cls(30, ArraySource(samples, hop=512)), self.path)
+                show = Show(self.path)
+
+                self.assertEqual(len(show), n)  # noqa: PT009
+                self.assertEqual(show.width, 60)  # noqa: PT009
+                self.assertAlmostEqual(show.fps, 44100 / 512)  # noqa: PT009
+                np.testing.assert_array_equal(show.frames, self._streamed(cls, samples))
+
+                del show  # Release the memory map before overwriting
+
+    def test_player(self) -> None:
+        frames = [np.full(8, i, float) for i in range(5)]
+        write_show(self.path, frames, fps=500)
+
+        player = ShowPlayer(Show(self.path))
+        published = []
+
+        while not player.audio.finished:
+            player.update()
+            published.append(player.publish())
+
+        self.assertEqual(published[-1].mirrored[0], 4)  # noqa: PT009
+        self.assertEqual(player.frame.data.size, 4)  # noqa: PT009
+
+    def test_bad_file(self) -> None:
+        self.path.write_bytes(b"RIFF" + bytes(100))
+
+        with self.assertRaises(ShowError):  # noqa: PT027
+            Show(self.path)
+
+    def test_empty(self) -> None:
+        write_show(self.path, [], fps=50)
+
+        self.assertEqual(len(Show(self.path)), 0)  # noqa: PT009
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+from viravis.smoothing import (
+    smooth_hor,
+    smooth_hor_np,
+    smooth_ver_directional,
+    smooth_ver_directional_np,
+)
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(42)
+        self.arrays = []
+
+        for size in (1, 5, 60, 301):
+            for scale in (1.0, 255.0, 1e4):
+                arr = rng.random(size) * scale
+                arr[rng.random(size) < 0.2] = 0
+                self.arrays.append(arr)
+
+        self.arrays.append(np.zeros(60))
+        self.arrays.append(np.arange(60, dtype=float))
+
+    def test_smooth_hor_golden(self) -> None:
+        for arr in self.arrays:
+            for k in (0, 1, 2, 5):
+                expected = smooth_hor(list(arr), k)
+                np.testing.assert_array_equal(smooth_hor_np(arr, k), expected)
+
+    def test_smooth_hor_in_place(self) -> None:
+        arr = self.arrays[-1].copy()
+        expected = smooth_hor(list(arr), 2)
+        smooth_hor_np(arr, 2, out=arr)
+        np.testing.assert_array_equal(arr, expected)
+
+    def test_smooth_ver_directional_golden(self) -> None:
+        rng = np.random.default_rng(7)
+
+        for arr in self.arrays:
+            new = arr + rng.normal(0, 10, arr.shape)
+            expected = smooth_ver_directional(arr, new, 0.6, 1e-3)
+
+            np.testing.assert_array_equal(
+                smooth_ver_directional_np(arr, new, 0.6, 1e-3), expected
+            )
+
+            smooth_ver_directional_np(arr, new, 0.6, 1e-3, out=arr)
+            np.testing.assert_array_equal(arr, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
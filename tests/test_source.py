@@ -0,0 +1,131 @@
+import tempfile
+import unittest
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from viravis.analyzer import AnalyzerFFT, AnalyzerRolling
+from viravis.source import ArraySource, RawSource, WavSource, replay
+
+
+def tone(freq: float, seconds: float = 1.0, rate: int = 44100) -> np.ndarray:
+    t = np.arange(int(seconds * rate)) / rate
+    return (np.sin(2 * np.pi * freq * t) * 16000).astype(np.int16)
+
+
+class Test(unittest.TestCase):
+    def test_array_frames(self) -> None:
+        source = ArraySource(tone(440), chunk=1024, hop=512)
+        self.assertEqual(len(source), (44100 - 1024) // 512 + 1)  # noqa: PT009
+
+        frames = 0
+        while source.read() is not None:
+            frames += 1
+
+        self.assertEqual(frames, len(source))  # noqa: PT009
+        self.assertTrue(source.finished)  # noqa: PT009
+
+    def test_loop(self) -> None:
+        source = ArraySource(tone(440, seconds=0.1), loop=True)
+
+        for _ in range(3 * len(source)):
+            self.assertIsNotNone(source.read())  # noqa: PT009
+
+        self.assertFalse(source.finished)  # noqa: PT009
+
+    def test_update_loop(self) -> None:
+        source = ArraySource(tone(440, seconds=0.1))
+        source.loop()  # Not shadowed by the `loop` argument
+
+        self.assertTrue(source.finished)  # noqa: PT009
+
+    def test_wav_stereo(self) -> None:
+        left, right = tone(440), tone(440)
+        samples = np.column_stack((left, right)).ravel()
+
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "tone.wav"
+            with wave.open(str(path), "wb") as f:
+                f.setnchannels(2)
+                f.setsampwidth(2)
+                f.setframerate(44100)
+                f.writeframes(samples.tobytes())
+
+            source = WavSource(path)
+            chunk = source.read()
+
+        self.assertIsNotNone(chunk)  # noqa: PT009
+        np.testing.assert_allclose(chunk, left[:1024])  # type: ignore[arg-type]
+
+    def test_raw_matches_array(self) -> None:
+        samples = tone(1000)
+
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "tone.pcm"
+            samples.tofile(path)
+
+            raw = RawSource(path)
+            array = ArraySource(samples)
+            raw.update()
+            array.update()
+
+            np.testing.assert_array_equal(
+                raw.get_values_np(60), array.get_values_np(60)
+            )
+            del raw  # Release the memory map before the file is removed
+
+    def test_replay(self) -> None:
+        for cls in (AnalyzerFFT, AnalyzerRolling):
+            source = ArraySource(tone(440, seconds=2), hop=512)
+            analyzer = cls(60, source)
+            stats = replay(analyzer)
+
+            self.assertEqual(stats.frames, len(source))  # noqa: PT009
+            self.assertEqual(analyzer.frame.index, stats.frames)  # noqa: PT009
+            self.assertGreater(stats.fps, 0)  # noqa: PT009
+
+    def test_stereo(self) -> None:
+        # Low tone on the left, high tone on the right
+        samples = np.column_stack((tone(200), tone(5000)))
+
+        for cls in (AnalyzerFFT, AnalyzerRolling):
+            source = ArraySource(samples, downmix=False)
+            analyzer = cls(60, source)
+
+            for _ in range(20):
+                analyzer.update()
+            analyzer.publish()
+
+            frame = analyzer.frame
+            self.assertEqual(analyzer.channels, 2)  # noqa: PT009
+            self.assertEqual(frame.data.shape, (2, 60))  # noqa: PT009
+            self.assertEqual(frame.mirrored.shape, (120,))  # noqa: PT009
+
+        left, right = analyzer.frame.data
+        self.assertFalse(np.array_equal(left, right))  # noqa: PT009
+
+    def test_stereo_fft_bands(self) -> None:
+        source = ArraySource(np.column_stack((tone(200), tone(5000))), downmix=False)
+        analyzer = AnalyzerFFT(60, source)
+        analyzer.update()
+        analyzer.publish()
+
+        # The left half is the left channel, reversed
+        mirrored = analyzer.frame.mirrored
+        self.assertGreater(  # noqa: PT009
+            int(np.argmax(mirrored[60:])), int(np.argmax(mirrored[59::-1]))
+        )
+
+    def test_tone_band(self) -> None:
+        source = ArraySource(tone(2000))
+        source.scale = "linear"
+        source.update()
+        bands = source.get_values_np(100)
+
+        expected = int(2000 / (44100 / 2) * 100)
+        self.assertLessEqual(abs(int(np.argmax(bands)) - expected), 1)  # noqa: PT009
+
+
+if __name__ == "__main__":
+    unittest.main()
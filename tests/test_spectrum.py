@@ -0,0 +1,37 @@
+import unittest
+
+import numpy as np
+
+from viravis.spectrum import Spectrum, band_edges, rfft_magnitude
+
+
+class Test(unittest.TestCase):
+    def test_band_count(self) -> None:
+        for scale in ("log", "mel", "linear"):
+            for size in (1, 60, 240, 600):
+                spectrum = Spectrum(1024, 44100, size, scale)  # type: ignore[arg-type]
+                bands = spectrum.bands(np.ones(spectrum.n_bins))
+                self.assertEqual(bands.shape, (size,))  # noqa: PT009
+                np.testing.assert_allclose(bands, 1.0)
+
+    def test_edges_monotonic(self) -> None:
+        edges = band_edges(513, 240, 44100, "log")
+        self.assertTrue(np.all(np.diff(edges) >= 0))  # noqa: PT009
+        self.assertEqual(edges[0], 1)  # noqa: PT009  (DC is skipped)
+
+    def test_tone(self) -> None:
+        rate, chunk = 44100, 1024
+        t = np.arange(chunk) / rate
+        freq = 50 * rate / chunk  # Centered on bin 50
+        magnitude = rfft_magnitude(np.sin(2 * np.pi * freq * t))
+
+        self.assertAlmostEqual(magnitude[50], 1.0, places=6)  # noqa: PT009
+
+        spectrum = Spectrum(chunk, rate, 60, "linear")
+        bands = spectrum.bands(magnitude)
+        expected = np.searchsorted(spectrum.edges, 50, side="right") - 1
+        self.assertEqual(int(np.argmax(bands)), expected)  # noqa: PT009
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import http.client
+import json
+import unittest
+from threading import Thread
+from time import sleep
+
+import numpy as np
+from helpers import FakeAudio
+
+from viravis.analyzer import AnalyzerFFT
+from viravis.protocol import decode_binary
+from viravis.stream import VAudioStreamServer
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.analyzer = AnalyzerFFT(4, FakeAudio())  # type: ignore[arg-type]
+        self.service = VAudioStreamServer(self.analyzer, port=0, host="127.0.0.1")
+        self.thread = Thread(target=self.service.run, daemon=True)
+        self.thread.start()
+
+    def tearDown(self) -> None:
+        self.service.stop()
+        self.thread.join()
+
+    def connect(self, route: str) -> http.client.HTTPResponse:
+        conn = http.client.HTTPConnection("127.0.0.1", self.service.port, timeout=5)
+        conn.request("GET", route)
+        response = conn.getresponse()
+        self.assertEqual(response.status, 200)  # noqa: PT009
+
+        # Wait for the client to be registered before publishing
+        while not self.service.clients:
+            sleep(0.01)
+
+        return response
+
+    def publish(self) -> None:
+        self.analyzer.update()
+        self.analyzer.publish()
+
+    def test_events(self) -> None:
+        response = self.connect("/events")
+        self.publish()
+
+        self.assertEqual(response.readline(), b"id: 1\n")  # noqa: PT009
+        event = json.loads(response.readline().removeprefix(b"data: "))
+        self.assertEqual(event["index"], 1)  # noqa: PT009
+        self.assertEqual(event["data"], self.analyzer.frame.mirrored.tolist())  # noqa: PT009
+
+    def test_binary(self) -> None:
+        response = self.connect("/stream")
+        self.publish()
+
+        frame = response.read(4 + 8 + 2)
+        np.testing.assert_array_equal(
+            decode_binary(frame), np.rint(self.analyzer.frame.mirrored)
+        )
+
+    def test_not_found(self) -> None:
+        conn = http.client.HTTPConnection("127.0.0.1", self.service.port, timeout=5)
+        conn.request("GET", "/nope")
+        self.assertEqual(conn.getresponse().status, 404)  # noqa: PT009
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import socket
+import struct
+import unittest
+
+import numpy as np
+from helpers import FakeAudio
+
+from viravis.analyzer import AnalyzerFFT
+from viravis.protocol import decode_binary
+from viravis.udp import VAudioUdp, e131_multicast_address
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.receiver.bind(("127.0.0.1", 0))
+        self.receiver.settimeout(5)
+        self.address = self.receiver.getsockname()
+
+    def tearDown(self) -> None:
+        self.receiver.close()
+
+    def analyzer(self, size: int) -> AnalyzerFFT:
+        analyzer = AnalyzerFFT(size, FakeAudio(0.5))  # type: ignore[arg-type]
+        analyzer.update()
+        analyzer.publish()
+        return analyzer
+
+    def test_raw(self) -> None:
+        analyzer = self.analyzer(30)
+        service = VAudioUdp(analyzer, [self.address], "raw")
+        service.send(analyzer.frame)
+        service.stop()
+
+        datagram = self.receiver.recv(2048)
+        np.testing.assert_array_equal(
+            decode_binary(datagram), np.rint(analyzer.frame.mirrored)
+        )
+
+    def test_e131_universes(self) -> None:
+        analyzer = self.analyzer(300)  # 600 values -> 2 universes
+        service = VAudioUdp(analyzer, [self.address], "e131", universe=7)
+
+        for sequence in (1, 2):
+            service.send(analyzer.frame)
+            received = [self.receiver.recv(2048) for _ in range(2)]
+
+            values = []
+            for universe, packet in zip((7, 8), received, strict=True):
+                self.assertEqual(packet[4:16], b"ASC-E1.17\x00\x00\x00")  # noqa: PT009
+                self.assertEqual(packet[111], sequence)  # noqa: PT009
+                self.assertEqual(struct.unpack_from("!H", packet, 113)[0], universe)  # noqa: PT009
+
+                (count,) = struct.unpack_from("!H", packet, 123)
+                self.assertEqual(len(packet), 125 + count)  # noqa: PT009
+                self.assertEqual(packet[125], 0)  # noqa: PT009  (start code)
+                values.extend(packet[126:])
+
+            np.testing.assert_array_equal(
+                values, np.clip(np.rint(analyzer.frame.mirrored), 0, 255)
+            )
+
+        service.stop()
+
+    def test_multicast_address(self) -> None:
+        self.assertEqual(e131_multicast_address(1), "239.255.0.1")  # noqa: PT009
+        self.assertEqual(e131_multicast_address(300), "239.255.1.44")  # noqa: PT009
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,24 @@
+import io
+import unittest
+from contextlib import redirect_stderr
+from unittest import mock
+
+from viravis.vaudio import AudioVisualizer
+
+
+def parse(*args: str) -> AudioVisualizer:
+    with mock.patch("sys.argv", ["viravis", "-p", "loop://", *args]):
+        return AudioVisualizer()
+
+
+class Test(unittest.TestCase):
+    def test_metrics(self) -> None:
+        self.assertTrue(parse("--metrics")._args.metrics)  # noqa: PT009, SLF001
+
+    def test_metrics_multiprocess(self) -> None:
+        stderr = io.StringIO()
+
+        with redirect_stderr(stderr), self.assertRaises(SystemExit):  # noqa: PT027
+            parse("--metrics", "--multiprocess")
+
+        self.assertIn("--metrics", stderr.getvalue())  # noqa: PT009
@@ -6,182 +6,374 @@ __all__ = (
     "AnalyzerFFT",
     "AnalyzerRollingEase",
     "AnalyzerFlat",
+    "AnalyzerPulse",
 )
 
+import logging
 from abc import abstractmethod
+from threading import Condition
 from typing import TYPE_CHECKING
 
 import numpy as np
 
-from .av_audio import (
-    Audio,
+from .beat import BeatDetector
+from .frame import Frame
+from .metrics import METRICS
+from .normalize import Normalizer
+from .smoothing import (
     fade_np,
     smooth,
-    smooth_hor,
-    smooth_ver_directional,
+    smooth_hor_np,
+    smooth_ver_directional_np,
 )
 
 if TYPE_CHECKING:
+    from .source import AudioSource
     from .typing import FloatArray
 
+logger = logging.getLogger(__name__)
+
+_frames = METRICS.counter("frames_total", "Published frames")
+
 
 def constrain(n: float, min_: float, max_: float) -> float:
     return min(max(n, min_), max_)
 
 
+def _channel_means(bands: FloatArray) -> FloatArray:
+    """Mean band value of every channel, truncated to an integer"""
+
+    return np.trunc(np.mean(bands, axis=-1))
+
+
 class Analyzer:
     """Base class for analyzers"""
 
-    def __init__(self, size: int, audio: None | Audio = None) -> None:
+    def __init__(
+        self,
+        size: int,
+        audio: None | AudioSource = None,
+        normalizer: Normalizer | None = None,
+        beat: BeatDetector | None = None,
+    ) -> None:
+        self.audio: AudioSource
+
         if audio:
             self.audio = audio
         else:
+            from .av_audio import Audio  # PyAudio is only needed here
+
             self.audio = Audio()
             self.audio.setup()
 
         self.size: int = size
-        self.levels: FloatArray = np.full(100, 0.0, float)
+        self.channels: int = self.audio.channels
+
+        # Frames analyzed per second of audio (lower if reads skip hops)
+        self.frame_rate: float = self.audio.frame_rate
+
+        if self.channels > 2:
+            logger.warning(
+                "Only the first 2 of %d channels are mirrored", self.channels
+            )
+
+        # Shape of the per-channel state (no channel axis for mono)
+        self.shape: tuple[int, ...] = (
+            (size,) if self.channels == 1 else (self.channels, size)
+        )
+
+        self.normalizer = normalizer or Normalizer()
         self.level: float = 1
 
+        # Onset detection and tempo (optional)
+        self.beat = beat
+
+        # Horizontal smoothing window (FFT and rolling modes)
+        self.smoothing: int = 2
+
+        # Scratch array for the spectrum bands
+        self._bands: FloatArray = np.zeros(self.shape, float)
+
+        # Latest published frame (replaced, never modified)
+        self.frame: Frame = Frame.empty(self.size, self.channels)
+        self._frame_cond = Condition()
+
+    def set_frame_rate(self, frame_rate: float) -> None:
+        """Adapt rate-dependent state to `update` being called less often"""
+
+        self.frame_rate = frame_rate
+
+        if self.beat is not None:
+            self.beat.set_frame_rate(frame_rate)
+
     def update(self) -> None:
         self.audio.update()
 
-        max_: float = max(float(np.max(self.get_data())), 1.0)
-        self.levels = np.concatenate(([max_], self.levels[:-1]))
-        self.level = float(np.mean(self.levels))
+        if self.beat is not None:
+            self.beat.push(self.audio.magnitudes)
+
+        with METRICS.time("analysis"):
+            self.analyze()
+
+            # The peak of the frame just analyzed, from the analyzer state
+            # (without computing the output array)
+            self.level = self.normalizer.push(self.get_peak())
+
+    @abstractmethod
+    def analyze(self) -> None:
+        """Compute the next frame from the latest audio data"""
+
+    def publish(self) -> Frame:
+        """Publish the data computed by `update` as a new frame
+
+        Normalization and mirroring are done once here, consumers
+        read `self.frame` without recomputing anything.
+        """
+
+        with METRICS.time("publish"):
+            data = self.get_data()
+            frame = Frame.create(
+                self.frame.index + 1,
+                data,
+                self.mirror(data),
+                beat=self.beat is not None and self.beat.onset,
+                bpm=0.0 if self.beat is None else self.beat.bpm,
+            )
+
+        with self._frame_cond:
+            self.frame = frame
+            self._frame_cond.notify_all()
+
+        _frames.inc()
+
+        return frame
+
+    def wait_frame(self, last: int, timeout: float | None = None) -> Frame:
+        """Wait until a frame newer than index `last` is published
+
+        Returns:
+            Latest frame (its index equals `last` on timeout)
+
+        """
+
+        with self._frame_cond:
+            self._frame_cond.wait_for(lambda: self.frame.index != last, timeout)
+            return self.frame
+
+    def get_peak(self) -> float:
+        """Maximum of `get_data()` (subclasses compute it from their state)"""
+
+        return float(np.max(self.get_data()))
 
     @abstractmethod
     def get_data(self) -> FloatArray:
         """Get analyzed data array"""
 
-    @abstractmethod
     def get_data_mirrored(self) -> FloatArray:
         """Get analyzed data array, mirrored
 
         [1, 2, 3] -> [3, 2, 1, 1, 2, 3]
         """
 
+        return self.mirror(self.get_data())
+
+    def mirror(self, data: FloatArray) -> FloatArray:
+        """Make the mirrored output from `data` (a `get_data()` result)
+
+        With several channels the first one (left) goes on the left
+        half and the second one (right) on the right half, the others
+        are only in the (not mirrored) data.
+        """
+
+        if data.ndim == 1:
+            return np.concatenate((np.flip(data), data))
+
+        return np.concatenate((np.flip(data[0]), data[1]))
+
 
 class AnalyzerRolling(Analyzer):
     """Create audio 'waves'"""
 
-    def __init__(self, size: int, audio: None | Audio = None) -> None:
-        super().__init__(size, audio)
-        self.values: FloatArray = np.ndarray((self.size,), float)
+    def __init__(
+        self,
+        size: int,
+        audio: AudioSource | None = None,
+        normalizer: Normalizer | None = None,
+        beat: BeatDetector | None = None,
+    ) -> None:
+        super().__init__(size, audio, normalizer, beat)
+        self.values: FloatArray = np.zeros(self.shape, float)
         self.fade_k = 1 / (3 * 10e4) * self.size
 
-    def update(self) -> None:
-        super().update()
+        self._shifted: FloatArray = np.zeros(self.shape, float)
 
-        avg = int(np.mean(self.audio.get_values_np(self.size)))
+    def analyze(self) -> None:
+        avg = _channel_means(self.audio.get_values_np(self.size, out=self._bands))
         # avg = min(max(avg * 0.8, 0), 255 - 50)
-        avg = constrain(avg * 0.8, 0, 255)
-
-        nonzero: FloatArray = self.values[self.values != 0]
+        avg = np.clip(avg * 0.8, 0, 255)
+
+        # Mean of the nonzero values
+        nonzero = np.count_nonzero(self.values, axis=-1)
+        baseline = np.divide(
+            self.values.sum(axis=-1),
+            nonzero,
+            out=np.ones(nonzero.shape, float),
+            where=nonzero != 0,
+        )
 
-        if len(nonzero):
-            baseline: float = float(np.mean(nonzero))
-        else:
-            baseline = 1.0
+        self._shifted[..., 1:] = self.values[..., :-1]
+        self._shifted[..., 0] = avg / baseline
+        fade_np(self._shifted, 0.002, out=self._shifted)
+        smooth(self._shifted, self.smoothing, out=self.values)
 
-        self.values = np.concatenate(([avg / baseline], self.values[0:-1]))
-        self.values = fade_np(self.values, 0.002)
-        self.values = smooth(self.values, 2)
+    def get_peak(self) -> float:
+        return constrain(float(np.max(self.values)) / self.level * 10, 0, 255)
 
     def get_data(self) -> FloatArray:
         values_adj = self.values
         values_adj = values_adj / self.level * 10
         return np.clip(values_adj, 0, 255)
 
-    def get_data_mirrored(self) -> FloatArray:
-        v = self.get_data() * 2
-        return np.concatenate((np.flip(v), v))
+    def mirror(self, data: FloatArray) -> FloatArray:
+        return super().mirror(data * 2)
 
 
 class AnalyzerFFT(Analyzer):
     """Analyze audio with Fast Fourier Transform (by frequency)"""
 
-    def __init__(self, size: int, audio: Audio | None = None) -> None:
-        super().__init__(size, audio)
-        self.fft: FloatArray = np.ndarray((self.size,), float)
-
-    def update(self) -> None:
-        super().update()
-        fft_prev: FloatArray = self.fft
-        self.fft = self.audio.get_values_np(self.size)
-        self.fft = np.array(
-            smooth_ver_directional(fft_prev, self.fft, 0.6, 1e-3),
-            dtype=float,
-        )
-        sm: list[int | float] = smooth_hor(list(self.fft), 2)
-        self.fft = np.array(sm)
+    # Attack and release of the bands (`smooth_ver_directional_np`)
+    K_UP = 0.6
+    K_DOWN = 1e-3
+
+    def __init__(
+        self,
+        size: int,
+        audio: AudioSource | None = None,
+        normalizer: Normalizer | None = None,
+        beat: BeatDetector | None = None,
+    ) -> None:
+        super().__init__(size, audio, normalizer, beat)
+        self.fft: FloatArray = np.zeros(self.shape, float)
+
+    def analyze(self) -> None:
+        # `batch.analyze_fft` does the same for a whole recording
+        fft = self.audio.get_values_np(self.size, out=self._bands)
+        smooth_ver_directional_np(self.fft, fft, self.K_UP, self.K_DOWN, out=self.fft)
+        smooth_hor_np(self.fft, self.smoothing, out=self.fft)
+
+    def get_peak(self) -> float:
+        return float(np.max(self.fft)) / self.level * 10
 
     def get_data(self) -> FloatArray:
         return self.fft / self.level * 10
 
-    def get_data_mirrored(self) -> FloatArray:
-        return np.concatenate((np.flip(self.fft), self.fft))
+    def mirror(self, _data: FloatArray) -> FloatArray:
+        # Not normalized
+        return super().mirror(self.fft)
 
 
 class AnalyzerRollingEase(Analyzer):
     """Create audio 'waves' - using standard smooth method"""
 
-    def __init__(self, size: int, audio: Audio | None = None) -> None:
-        super().__init__(size, audio)
-        self.values: FloatArray = np.ndarray((self.size,), float)
+    def __init__(
+        self,
+        size: int,
+        audio: AudioSource | None = None,
+        normalizer: Normalizer | None = None,
+        beat: BeatDetector | None = None,
+    ) -> None:
+        super().__init__(size, audio, normalizer, beat)
+        self.values: FloatArray = np.zeros(self.shape, float)
 
-    def update(self) -> None:
-        super().update()
+        self._shifted: FloatArray = np.zeros(self.shape, float)
 
-        avg = int(np.mean(self.audio.get_values_np(self.size)))
-        avg = min(max(avg * 0.8, 0), 255 - 50)
-        new = avg
+    def analyze(self) -> None:
+        avg = _channel_means(self.audio.get_values_np(self.size, out=self._bands))
+        new = np.clip(avg * 0.8, 0, 255 - 50)
 
-        prv = self.values[0]
+        prv = self.values[..., 0]
         val = prv + (new - prv) * 0.3
 
-        self.values = np.concatenate(([val], self.values[0:-1]))
-        self.values = fade_np(self.values, 0.002)
+        self._shifted[..., 1:] = self.values[..., :-1]
+        self._shifted[..., 0] = val
+        fade_np(self._shifted, 0.002, out=self.values)
         # self.values = smooth(self.values, 3, 0.9)
 
+    def get_peak(self) -> float:
+        return constrain(float(np.max(self.values)) ** 2, 0, 255)
+
     def get_data(self) -> FloatArray:
         values_adj = self.values**2
         return np.clip(values_adj, 0, 255)
 
-    def get_data_mirrored(self) -> FloatArray:
-        v = self.get_data()
-        return np.concatenate((np.flip(v), v))
-
 
 class AnalyzerFlat(Analyzer):
     """Flat"""
 
-    def __init__(self, size: int, audio: Audio | None = None) -> None:
-        super().__init__(size, audio)
-        self.current: float = 0.0
-        self.value: float = 0.0
-        self.history: FloatArray = np.ndarray(10, float)
+    def __init__(
+        self,
+        size: int,
+        audio: AudioSource | None = None,
+        normalizer: Normalizer | None = None,
+        beat: BeatDetector | None = None,
+    ) -> None:
+        super().__init__(size, audio, normalizer, beat)
 
-    def update(self) -> None:
-        super().update()
+        # One value per channel (0D for mono)
+        self.current: FloatArray = np.zeros(self.shape[:-1], float)
+        self.value: FloatArray = np.zeros(self.shape[:-1], float)
 
-        avg = int(np.mean(self.audio.get_values_np(self.size)))
-        new: float = min(max(avg * 0.8, 0), 255 - 50)
+    def analyze(self) -> None:
+        avg = _channel_means(self.audio.get_values_np(self.size, out=self._bands))
+        new = np.clip(avg * 0.8, 0, 255 - 50)
 
-        prv: float = self.history[0]
+        prv = self.current
         self.current = prv + (new - prv) * 0.1
 
-        self.history = np.concatenate(([self.current], self.history[:-1]))
-
         self.value = avg
 
         # self.values = smooth(self.values, 3, 0.9)
 
+    def get_peak(self) -> float:
+        return constrain(float(np.max(self.current)) ** 2, 0, 255)
+
     def get_data(self) -> FloatArray:
-        values = np.full(self.size, self.current, float)
+        values = np.broadcast_to(self.current[..., np.newaxis], self.shape)
         values_adj = values**2
         return np.clip(values_adj, 0, 255, dtype=float)
 
-    def get_data_mirrored(self) -> FloatArray:
-        v = self.get_data()
-        return np.concatenate((np.flip(v), v))
+
+class AnalyzerPulse(Analyzer):
+    """Flash on every beat, fading out until the next one"""
+
+    def __init__(
+        self,
+        size: int,
+        audio: AudioSource | None = None,
+        normalizer: Normalizer | None = None,
+        beat: BeatDetector | None = None,
+        half_life: float = 0.1,
+    ) -> None:
+        super().__init__(size, audio, normalizer, beat)
+
+        if self.beat is None:
+            self.beat = BeatDetector(self.frame_rate)
+
+        self.half_life = half_life
+        self.fade = 0.5 ** (1 / (half_life * self.frame_rate))
+
+        self.value: float = 0.0
+
+    def set_frame_rate(self, frame_rate: float) -> None:
+        super().set_frame_rate(frame_rate)
+        self.fade = 0.5 ** (1 / (self.half_life * frame_rate))
+
+    def analyze(self) -> None:
+        onset = self.beat is not None and self.beat.onset
+        self.value = 255.0 if onset else self.value * self.fade
+
+    def get_peak(self) -> float:
+        return self.value
+
+    def get_data(self) -> FloatArray:
+        return np.full(self.shape, self.value)
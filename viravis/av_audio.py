@@ -2,209 +2,344 @@ from __future__ import annotations
 
 __all__ = [
     "Audio",
+    "SAMPLE_FORMATS",
+    "decode_samples",
     "smooth_ver",
     "smooth_hor",
+    "smooth_hor_np",
     "fade_np",
     "fade",
     "smooth",
     "bounds",
     "smooth_ver_directional",
+    "smooth_ver_directional_np",
 ]
 
-import struct
-from typing import TYPE_CHECKING, Any, Iterable, Sequence
+import logging
+from threading import Event
+from time import sleep
+from typing import TYPE_CHECKING, Any, Mapping
 
 import numpy as np
 import pyaudio as pa
 
+from .devices import DEVICES
+from .ring import SampleRing
+
+# Re-exported, the smoothing functions used to be defined here
+from .smoothing import (
+    bounds,
+    fade,
+    fade_np,
+    smooth,
+    smooth_hor,
+    smooth_hor_np,
+    smooth_ver,
+    smooth_ver_directional,
+    smooth_ver_directional_np,
+)
+from .source import AudioSource
+
 if TYPE_CHECKING:
-    from .typing import FloatArray
+    from .devices import Query
+    from .typing import FloatArray, SampleArray
 
+logger = logging.getLogger(__name__)
 
-class Audio:
-    @staticmethod
-    def select() -> str | None:
-        temp_audio = pa.PyAudio()
-        device_count = temp_audio.get_device_count()
+# Seconds between attempts to reopen a lost device (doubling up to the max)
+RETRY_DELAY = 0.5
+MAX_RETRY_DELAY = 5.0
 
-        for i in range(device_count):
-            device = temp_audio.get_device_info_by_index(i)
-            if device.get("maxInputChannels"):
-                print(f"[{i}] {device.get('name')}")  # noqa: T201 (for user interaction)
+# PyAudio sample format -> (dtype, factor to the int16 full scale)
+SAMPLE_FORMATS: dict[int, tuple[type[np.number[Any]], float]] = {
+    pa.paInt16: (np.int16, 1.0),
+    pa.paInt32: (np.int32, 2.0**-16),
+    pa.paFloat32: (np.float32, 2.0**15),
+}
 
-        index = int(input())
-        _x: Any = temp_audio.get_device_info_by_index(index).get("name")
 
-        if not isinstance(_x, str):
-            return None
+def decode_samples(
+    data: bytes, format_: int, channels: int = 1, *, downmix: bool = True
+) -> SampleArray:
+    """View a raw PyAudio buffer as samples in the int16 range
 
-        port: str = _x
+    Mono int16 is returned as a view of `data` (no copy), otherwise
+    scaling and the channel downmix are a single vectorized step.
+    Without `downmix`, channels are de-interleaved into (n, channels).
+    """
 
-        return port
+    dtype, factor = SAMPLE_FORMATS[format_]
+    raw = np.frombuffer(data, dtype=dtype)
 
-    @staticmethod
-    def select_by_name(name: str) -> int | None:
-        temp_audio = pa.PyAudio()
-        device_count = temp_audio.get_device_count()
+    if channels == 1:
+        return raw if factor == 1.0 else raw * factor
 
-        filtered: list[int] = []
-        for i in range(device_count):
-            device = temp_audio.get_device_info_by_index(i)
-            if device.get("maxInputChannels"):
-                device_name = device.get("name")
+    if not downmix:
+        frames = raw.reshape(-1, channels)
+        return frames if factor == 1.0 else frames * factor
 
-                if not isinstance(device_name, str):
-                    continue
+    # Average interleaved channels: [L, R, L, R, ...] @ [f/2, f/2]
+    weights = np.full(channels, factor / channels)
+    return raw.reshape(-1, channels) @ weights
 
-                if name in device_name:
-                    filtered.append(i)
 
-        if len(filtered) == 0:
+class Audio(AudioSource):
+    """Live audio from a PyAudio input device"""
+
+    @staticmethod
+    def select() -> str | None:
+        for device in DEVICES.inputs():
+            print(f"[{device.index}] {device.name}")  # noqa: T201 (for user interaction)
+
+        device = DEVICES.find(int(input()))
+
+        if device is None:
             return None
 
-        return filtered[0]
+        return device.name
 
-    def __init__(self) -> None:
-        self._chunk = 1024
-        self._format = pa.paInt16
-        self._channels = 1
-        self._rate = 44100
-        self._audio = pa.PyAudio()
-        self._k = 1000  # Koefficient for multiplying
+    @staticmethod
+    def select_by_name(name: Query) -> int | None:
+        """Index of the first input device matching `name`
 
-        self.device_index = 1
+        See `Devices.find` (a name, a pattern or an index)
+        """
 
-        self._stream: pa.Stream
-        self._fft: FloatArray
+        device = DEVICES.find(name)
 
-    def setup(self) -> None:
-        self._stream = self._audio.open(
-            input_device_index=self.device_index,
-            format=self._format,
-            channels=self._channels,
-            rate=self._rate,
-            input=True,
-            frames_per_buffer=self._chunk,
-        )
+        if device is None:
+            return None
 
-    def update(self) -> None:
-        # Read raw wave data
-        data: bytes = self._stream.read(self._chunk)
-        data_int = struct.unpack(f"{self._chunk}h", data)
+        return device.index
+
+    def __init__(
+        self,
+        chunk: int = 1024,
+        rate: int = 44100,
+        channels: int = 1,
+        sample_format: int = pa.paInt16,
+        hop: int | None = None,
+        *,
+        downmix: bool = True,
+    ) -> None:
+        """Capture audio from a PyAudio input device
+
+        Args:
+            chunk: FFT size (samples per analyzed frame)
+            rate: Sample rate
+            channels: Number of channels to capture
+            sample_format: PyAudio sample format
+            hop: Capture in the stream callback and analyze a new frame
+                every `hop` samples (frames overlap if `hop < chunk`).
+                If None, `update` blocks on reading `chunk` samples.
+            downmix: Analyze the mean of the channels (otherwise each
+                channel is analyzed separately)
+
+        """
+
+        if sample_format not in SAMPLE_FORMATS:
+            msg = f"Unsupported sample format: {sample_format}"
+            raise ValueError(msg)
+
+        super().__init__(chunk, rate, 1 if downmix else channels)
+
+        self._format = sample_format
+        self._channels = channels
+        self._downmix = downmix
+        self._devices = DEVICES  # Shared PortAudio instance
 
-        # Calculate FFT
-        fft = np.abs(np.fft.fft(data_int))
+        self.device_index = 1
 
-        self._fft = fft * 2 / (11000 * self._chunk)
+        self._stream: pa.Stream | None = None
 
-    def loop(self) -> None:
-        while True:
-            self.update()
+        # Lost device
+        self._lost: bool = False
+        self._lost_name: str | None = None
+        self._retry_delay: float = 0.0
 
-    def get_values(self, n: int = 100) -> list[int | float]:
-        return self.get_values_np(n).tolist()
+        # Callback capture
+        self._hop = hop
+        self._ring = SampleRing(max(4 * chunk, 4 * (hop or 0)), self.channels)
+        shape = (chunk,) if self.channels == 1 else (chunk, self.channels)
+        self._samples: FloatArray = np.zeros(shape, float)
+        self._read_pos: int = 0
+        self._data_ready = Event()
 
-    def get_values_np(self, n: int = 100) -> FloatArray:
-        # ins: IntArray = np.linspace(0, self._chunk, n, dtype=int, endpoint=False)
-        # values_60: FloatArray = self._fft[ins]
+        self.overruns: int = 0  # Input overflows reported by PortAudio
+        self.dropped_frames: int = 0  # Hops skipped because analysis lagged
 
-        # values = np.array([n.mean() for n in np.array_split(self._fft, n)])
+    @property
+    def frame_rate(self) -> float:
+        return self._rate / (self._hop or self._chunk)
 
-        values: FloatArray = np.resize(self._fft, n)
+    @property
+    def blocking(self) -> bool:
+        """Reads block on the device (no callback) and overflow if late"""
 
-        return (values * self._k).astype(float)
+        return self._hop is None
 
+    @property
+    def live(self) -> bool:
+        return True
 
-def smooth_ver(
-    old: Iterable[int | float], new: Iterable[int | float], k: float
-) -> list[int | float]:
-    """Make numbers go up and down smoothly
+    def setup(self) -> None:
+        host = self._devices.host
+
+        if self._hop is not None:
+            self._stream = host.open(
+                input_device_index=self.device_index,
+                format=self._format,
+                channels=self._channels,
+                rate=self._rate,
+                input=True,
+                frames_per_buffer=self._hop,
+                stream_callback=self._callback,
+            )
+            return
+
+        self._stream = host.open(
+            input_device_index=self.device_index,
+            format=self._format,
+            channels=self._channels,
+            rate=self._rate,
+            input=True,
+            frames_per_buffer=self._chunk,
+        )
 
-    k: koefficient of smoothing
-    """
+    def close(self) -> None:
+        stream, self._stream = self._stream, None
 
-    k = 1 / k
-    return [y + (x - y) * k for x, y in zip(new, old)]
+        if stream is None:
+            return
 
+        try:
+            stream.stop_stream()
+            stream.close()
+        except OSError:  # The device is gone already
+            logger.debug("Error closing the audio stream", exc_info=True)
 
-def smooth_ver_directional(
-    old: Iterable[int | float], new: Iterable[int | float], k_up: float, k_down: float
-) -> list[int | float]:
-    """Make numbers go up and down smoothly
+    def reconnect(self) -> bool:
+        """Reopen the device after it was reset or plugged in again
 
-    k: koefficient of smoothing (0-1)
-    """
+        Rescans the devices (restarting the shared PortAudio instance)
+        and opens the device with the same name. Returns whether it was
+        reopened.
+        """
 
-    return [y + (x - y) * (k_up if (x > y) else k_down) for x, y in zip(new, old)]
+        self.close()
 
+        # The index may be gone after a rescan, the name is kept until
+        # the device is found again
+        if self._lost_name is None:
+            current = self._devices.find(self.device_index)
+            self._lost_name = None if current is None else current.name
 
-def smooth_hor(list_: Sequence[int | float], k: int) -> list[int | float]:
-    """Moving average
+        self._devices.rescan()
 
-    k: the size of the half-window (in one side)
-    """
-    return [
-        sum(list_[h] for h in range(max(i - k, 0), min(i + k, len(list_))))
-        // ((k + 1) * 2 - list_[max(i - k, 0) : min(i + k, len(list_))].count(0))
-        for i in range(len(list_))
-    ]
+        name = self._lost_name
+        device = None if name is None else self._devices.find(name)
 
+        if device is None:
+            return False
 
-def smooth_hor_fix(list_: Sequence[int | float], k: int) -> list[int | float]:
-    """Moving average
+        self.device_index = device.index
 
-    k: the size of the half-window (in one side)
-    """
-    return [
-        sum(list_[max(i - k, 0) : min(i + k, len(list_))]) // (k * 2 + 1)
-        for i in range(len(list_))
-    ]
+        try:
+            self.setup()
+        except OSError:
+            logger.warning("Could not open `%s`", device.name, exc_info=True)
+            return False
 
+        logger.info("Reconnected to `%s`", device.name)
+        self._lost_name = None
+        return True
 
-def fade(list_: list[int | float]) -> list[int | float]:
-    """Make numbers smaller with index
+    def _recover(self) -> None:
+        """Reconnect a lost device, waiting longer after every failed try"""
 
-    [10, 10, 10] -> [9, 8, 7]
-    """
+        if not self._lost:
+            logger.warning("Audio device lost, reconnecting")
+            self._lost = True
 
-    return [max(list_[i] - i, 0) for i in range(len(list_))]
+        if self.reconnect():
+            self._lost = False
+            self._retry_delay = 0.0
+            return
 
+        delay = min(max(2 * self._retry_delay, RETRY_DELAY), MAX_RETRY_DELAY)
+        self._retry_delay = delay
+        logger.debug("Audio device not found, retrying in %.1f s", delay)
+        sleep(delay)
 
-def fade_np(arr: FloatArray, amount: float = 1) -> FloatArray:
-    """Make numbers smaller with index
+    def _callback(
+        self,
+        in_data: bytes | None,
+        _frame_count: int,
+        _time_info: Mapping[str, float],
+        status_flags: int,
+    ) -> tuple[None, int]:
+        """PyAudio stream callback (runs in the PortAudio thread)"""
 
-    arr: Array of numbers
-    amount: Amount of fading (default = 1)
+        if status_flags & pa.paInputOverflow:
+            self.overruns += 1
 
-    Examples:
-        [10, 10, 10] -> [9, 8, 7]
+        if in_data:
+            self._ring.write(
+                decode_samples(
+                    in_data, self._format, self._channels, downmix=self._downmix
+                )
+            )
+            self._data_ready.set()
 
-    """
+        return None, pa.paContinue
 
-    # Creates something similar to [1, 2, 3] if amount == 1
-    # and [2, 4, 6] if amount == 2, etc.
-    mask: FloatArray = np.arange(len(arr)) * amount
+    def _wait_hop(self, hop: int, timeout: float = 0.5) -> bool:
+        """Wait until `hop` new samples are captured"""
 
-    # Subtract and constrain at 0
-    a: FloatArray = arr - mask
-    a[a < 0] = 0
+        while self._ring.written - self._read_pos < hop:
+            if not self._data_ready.wait(timeout):
+                return False
+            self._data_ready.clear()
 
-    return a
+        return True
 
+    def read(self) -> SampleArray | None:
+        if self._hop is not None:
+            return self._read_from_ring(self._hop)
 
-def bounds(list_: list[int | float]) -> list[int | float]:
-    """Constrain values in list between 0 and 255"""
-    return [min(max(i, 0), 255) for i in list_]
+        if self._lost:
+            self._recover()
+            return None
 
+        if self._stream is None:
+            return None
 
-def smooth(y: FloatArray, box_pts: int, amt: float = 1.0) -> FloatArray:
-    """Smooth a numpy array with a box filter"""
+        # Read raw wave data
+        try:
+            data: bytes = self._stream.read(self._chunk)
+        except OSError as e:
+            if e.errno == pa.paInputOverflowed:
+                # Read too late: the chunk is lost, the stream still works
+                self.overruns += 1
+                return None
+
+            self._recover()
+            return None
+
+        return decode_samples(data, self._format, self._channels, downmix=self._downmix)
 
-    box = np.full(box_pts, amt) / box_pts
-    return np.convolve(y, box, mode="same")
+    def _read_from_ring(self, hop: int) -> SampleArray | None:
+        if not self._wait_hop(hop):
+            if self._lost or (
+                self._stream is not None and not self._stream.is_active()
+            ):
+                self._recover()
+
+            return None
 
+        lag = self._ring.written - self._read_pos
+        self.dropped_frames += lag // hop - 1
 
-# def smooth_h(y: FloatArray, box_pts: int, amt: float = 1.0) -> FloatArray:
-#     res: FloatArray = np.ndarray(y.shape)
+        self._read_pos = self._ring.read_latest(self._samples)
 
-#     for i in range(y.size):
+        return self._samples
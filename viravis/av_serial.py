@@ -40,9 +40,15 @@ class Serial:
         for i, p in enumerate(avail_ports):
             print(f"[{i}] {p}")  # noqa: T201 (for user interaction)
 
-    def __init__(self, port: str) -> None:
-        self._port = serial.Serial(port=port, baudrate=115200)
-
-    def send(self, data: str) -> None:
-        """Send str data to serial"""
-        self._port.write(data.encode())
+    def __init__(self, port: str, baudrate: int = 115200) -> None:
+        """Open a serial port by name or pyserial URL (e.g. `loop://`)"""
+        self._port = serial.serial_for_url(port, baudrate=baudrate)
+
+    def send(self, data: str | bytes) -> None:
+        """Send str or binary data to serial"""
+        if isinstance(data, str):
+            data = data.encode()
+        self._port.write(data)
+
+    def close(self) -> None:
+        self._port.close()
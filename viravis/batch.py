@@ -0,0 +1,172 @@
+"""Analyze a whole recording at once (for pre-rendered shows)
+
+The spectra of all frames are computed with one `rfft` over a strided
+frame matrix and binned with one `np.add.reduceat`. Smoothing and
+normalization depend on the previous frame, so they are scanned over
+the frames, but only as a handful of array operations per frame.
+
+The result is what `AnalyzerFFT` publishes frame by frame when fed
+the same samples (see `source.replay`).
+"""
+
+from __future__ import annotations
+
+__all__ = ["BatchAnalysis", "analyze_fft", "analyze_source", "frame_matrix"]
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .analyzer import AnalyzerFFT
+from .normalize import Normalizer
+from .smoothing import smooth_hor_np, smooth_ver_directional_np
+from .source import to_int16_range
+from .spectrum import Spectrum, rfft_magnitude
+
+if TYPE_CHECKING:
+    from .source import ArraySource
+    from .spectrum import BandScale
+    from .typing import FloatArray, SampleArray
+
+
+@dataclass
+class BatchAnalysis:
+    spectrum: FloatArray  # (n_frames, size) smoothed bands (`AnalyzerFFT.fft`)
+    levels: FloatArray  # (n_frames,) normalization level of every frame
+
+    def __len__(self) -> int:
+        return len(self.spectrum)
+
+    @property
+    def data(self) -> FloatArray:
+        """Normalized frames (`AnalyzerFFT.get_data`)"""
+
+        return self.spectrum / self.levels[:, np.newaxis] * 10
+
+    @property
+    def mirrored(self) -> FloatArray:
+        """Mirrored frames (`AnalyzerFFT.get_data_mirrored`)"""
+
+        return np.concatenate((np.flip(self.spectrum, axis=1), self.spectrum), axis=1)
+
+
+def frame_matrix(samples: SampleArray, chunk: int, hop: int) -> SampleArray:
+    """(n_frames, chunk) view of overlapping frames, `hop` samples apart
+
+    Multichannel samples (n, channels) are downmixed first.
+    """
+
+    samples = to_int16_range(samples)
+
+    if samples.ndim == 2:
+        samples = samples.mean(axis=1)
+
+    if len(samples) < chunk:
+        return np.empty((0, chunk), samples.dtype)
+
+    return sliding_window_view(samples, chunk)[::hop]
+
+
+def _band_matrix(frames: SampleArray, spectrum: Spectrum, block: int) -> FloatArray:
+    """Bands of every frame (scaled like `AudioSource.get_values_np`)"""
+
+    bands: FloatArray = np.empty((len(frames), spectrum.size), float)
+
+    # In blocks, to bound the memory of the windowed and complex spectra
+    for start in range(0, len(frames), block):
+        magnitude = rfft_magnitude(frames[start : start + block]) / 11000
+        spectrum.bands(magnitude, out=bands[start : start + block])
+
+    bands *= 1000
+    return bands
+
+
+def _scan_smoothing(bands: FloatArray, smoothing: int) -> FloatArray:
+    """Attack/release and horizontal smoothing of every frame"""
+
+    out: FloatArray = np.empty_like(bands)
+    previous: FloatArray = np.zeros(bands.shape[1], float)
+    fft: FloatArray = np.empty(bands.shape[1], float)
+
+    for t, new in enumerate(bands):
+        smooth_ver_directional_np(
+            previous, new, AnalyzerFFT.K_UP, AnalyzerFFT.K_DOWN, out=fft
+        )
+        smooth_hor_np(fft, smoothing, out=out[t])
+        previous = out[t]
+
+    return out
+
+
+def _scan_levels(spectrum: FloatArray, normalizer: Normalizer) -> FloatArray:
+    """Normalization level of every frame (`Analyzer.update`)"""
+
+    levels: FloatArray = np.empty(len(spectrum), float)
+
+    if not len(spectrum):
+        return levels
+
+    level = normalizer.level
+
+    # Normalized by the level of the previous frame, like `AnalyzerFFT.get_peak`
+    for t, peak in enumerate(spectrum.max(axis=1).tolist()):
+        level = normalizer.push(peak / level * 10)
+        levels[t] = level
+
+    return levels
+
+
+def analyze_fft(
+    samples: SampleArray,
+    size: int,
+    rate: int = 44100,
+    chunk: int = 1024,
+    hop: int | None = None,
+    scale: BandScale = "log",
+    normalizer: Normalizer | None = None,
+    smoothing: int = 2,
+    block: int = 512,
+) -> BatchAnalysis:
+    """Analyze all `samples` like `AnalyzerFFT`
+
+    Args:
+        samples: Samples, shaped (n,) or (n, channels)
+        size: Number of bands
+        rate: Sample rate
+        chunk: FFT size
+        hop: Samples between frames (default = chunk)
+        scale: Spacing of the frequency bands
+        normalizer: Level tracking (default: like `Analyzer`)
+        smoothing: Horizontal smoothing window (`Analyzer.smoothing`)
+        block: Frames transformed at once
+
+    """
+
+    frames = frame_matrix(samples, chunk, hop or chunk)
+    spectrum = Spectrum(chunk, rate, size, scale)
+
+    smoothed = _scan_smoothing(_band_matrix(frames, spectrum, block), smoothing)
+    levels = _scan_levels(smoothed, normalizer or Normalizer())
+    return BatchAnalysis(smoothed, levels)
+
+
+def analyze_source(
+    source: ArraySource,
+    size: int,
+    normalizer: Normalizer | None = None,
+    smoothing: int = 2,
+) -> BatchAnalysis:
+    """Analyze all samples of a (file) source like `AnalyzerFFT`"""
+
+    return analyze_fft(
+        source.samples,
+        size,
+        source.rate,
+        source.chunk,
+        source.hop,
+        source.scale,
+        normalizer,
+        smoothing,
+    )
@@ -0,0 +1,209 @@
+"""Onset (beat) detection and tempo estimation
+
+Every analyzed spectrum is reduced to one number, its spectral flux:
+the mean increase of the log magnitudes since the previous spectrum
+(decreases are ignored). A frame is an onset when the flux is well
+above its recent mean. The tempo is the lag with the highest
+autocorrelation of the flux, updated incrementally, so a frame costs
+the same however long the windows are.
+"""
+
+from __future__ import annotations
+
+__all__ = ["BeatDetector"]
+
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .ring import RingBuffer
+
+if TYPE_CHECKING:
+    from .typing import FloatArray
+
+
+class BeatDetector:
+    """Detect onsets and estimate the tempo from consecutive spectra
+
+    Args:
+        frame_rate: Spectra pushed per second
+        history: Seconds of flux the onset threshold is computed from
+        sensitivity: Onset threshold, in standard deviations above the
+            mean flux
+        ratio: Onset threshold, at least this times the mean flux (so
+            the random flux of steady noise isn't taken for onsets)
+        min_interval: Shortest time between onsets (seconds)
+        tempo_window: Seconds of flux the tempo is estimated from
+        bpm_range: Lowest and highest tempo considered
+
+    """
+
+    def __init__(
+        self,
+        frame_rate: float,
+        history: float = 1.0,
+        sensitivity: float = 1.5,
+        ratio: float = 1.5,
+        min_interval: float = 0.2,
+        tempo_window: float = 6.0,
+        bpm_range: tuple[float, float] = (60.0, 180.0),
+    ) -> None:
+        self.sensitivity = sensitivity
+        self.ratio = ratio
+
+        self.onset: bool = False  # The latest spectrum is an onset
+        self.flux: float = 0.0
+        self.beats: int = 0  # Number of onsets so far
+
+        # Windows in seconds, converted to frames by `set_frame_rate`
+        self._history_seconds = history
+        self._min_interval = min_interval
+        self._tempo_seconds = tempo_window
+        self._bpm_range = bpm_range
+
+        self.frame_rate: float = 0.0
+        self.set_frame_rate(frame_rate)
+
+    def set_frame_rate(self, frame_rate: float) -> None:
+        """Change the number of spectra pushed per second
+
+        The flux history and the tempo estimate start over.
+        """
+
+        if frame_rate == self.frame_rate:
+            return
+
+        self.frame_rate = frame_rate
+        self.bpm: float = 0.0  # 0 until the tempo window is filled
+        self.frames: int = 0  # Number of spectra pushed at this rate
+
+        # Log magnitudes of the previous and the current spectrum
+        self._previous: FloatArray = np.empty(0, float)
+        self._log: FloatArray = np.empty(0, float)
+        self._diff: FloatArray = np.empty(0, float)
+
+        history, min_interval = self._history_seconds, self._min_interval
+        tempo_window, bpm_range = self._tempo_seconds, self._bpm_range
+
+        self._history = capacity = max(round(history * frame_rate), 2)
+        self._mean = RingBuffer(capacity)
+        self._mean_sq = RingBuffer(capacity)
+        self._refractory = round(min_interval * frame_rate)
+        self._last_onset = -self._refractory
+
+        # Lags (in frames) of the tempo range, with two more on each
+        # side for smoothing and interpolating the peak
+        self._lag_lo = max(math.floor(60 * frame_rate / bpm_range[1]), 3)
+        self._lag_hi = math.ceil(60 * frame_rate / bpm_range[0])
+        self._lags = np.arange(self._lag_hi + 3)
+
+        # Prefer tempos near 120 BPM (a beat every other lag peak is
+        # just as periodic, halving the tempo)
+        bpm = 60 * frame_rate / np.maximum(self._lags, 1)
+        self._weights = np.exp(-0.5 * (np.log2(bpm / 120) / 0.6) ** 2)
+
+        # Onset strength history and its autocorrelation over the last
+        # `window` frames, for every lag
+        self._window = max(round(tempo_window * frame_rate), len(self._lags))
+        self._strength = np.zeros(self._window + len(self._lags), float)
+        self._acf = np.zeros(len(self._lags), float)
+
+    def push(self, spectrum: FloatArray) -> bool:
+        """Account for a new magnitude spectrum (any shape)
+
+        Returns:
+            Whether it is an onset
+
+        """
+
+        self.flux = flux = self._spectral_flux(spectrum)
+
+        # Threshold from the history before this frame
+        mean = self._mean.mean
+        std = math.sqrt(max(self._mean_sq.mean - mean * mean, 0.0))
+        threshold = max(mean + self.sensitivity * std, mean * self.ratio)
+
+        self.onset = (
+            flux > threshold
+            and self.frames >= self._history  # No threshold before that
+            and self.frames - self._last_onset >= self._refractory
+        )
+
+        if self.onset:
+            self._last_onset = self.frames
+            self.beats += 1
+
+        self._mean.push(flux)
+        self._mean_sq.push(flux * flux)
+
+        self._update_tempo(max(flux - mean, 0.0))
+        self.frames += 1
+
+        return self.onset
+
+    def _spectral_flux(self, spectrum: FloatArray) -> float:
+        if self._log.shape != spectrum.shape:
+            # First spectrum, or the FFT size changed: no flux yet
+            self._log = np.log1p(spectrum)
+            self._previous = self._log.copy()
+            self._diff = np.empty_like(self._log)
+            return 0.0
+
+        log, previous, diff = self._log, self._previous, self._diff
+
+        np.log1p(spectrum, out=log)
+        np.subtract(log, previous, out=diff)
+        np.maximum(diff, 0, out=diff)
+
+        # The current spectrum becomes the previous one
+        self._log, self._previous = previous, log
+
+        return float(diff.mean())
+
+    def _update_tempo(self, strength: float) -> None:
+        buffer = self._strength
+        capacity = len(buffer)
+        t = self.frames
+
+        buffer[t % capacity] = strength
+
+        # Add the products with the new value, drop the products with
+        # the value leaving the window
+        old = (t - self._window) % capacity
+        self._acf += strength * buffer[(t - self._lags) % capacity]
+        self._acf -= buffer[old] * buffer[(old - self._lags) % capacity]
+
+        if t % self._window == self._window - 1:
+            self._recompute_acf()
+
+        if t >= self._window:
+            self.bpm = self._estimate_bpm()
+
+    def _recompute_acf(self) -> None:
+        """Sum the window again, so float error doesn't accumulate"""
+
+        buffer = self._strength
+        capacity = len(buffer)
+        latest = (self.frames - np.arange(self._window)) % capacity
+        values = buffer[latest]
+
+        for lag in self._lags:
+            self._acf[lag] = values @ buffer[(latest - lag) % capacity]
+
+    def _estimate_bpm(self) -> float:
+        lo, hi = self._lag_lo, self._lag_hi
+
+        # A period between two lags splits its peak over both of them
+        acf = np.convolve(self._acf, (0.25, 0.5, 0.25), "same") * self._weights
+        lag = lo + int(np.argmax(acf[lo : hi + 1]))
+
+        if acf[lag] <= 0:
+            return 0.0
+
+        # Parabolic interpolation between the neighbouring lags
+        a, b, c = acf[lag - 1], acf[lag], acf[lag + 1]
+        curvature = a - 2 * b + c
+        offset = 0.5 * (a - c) / curvature if curvature < 0 else 0.0
+
+        return 60 * self.frame_rate / (lag + offset)
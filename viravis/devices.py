@@ -0,0 +1,226 @@
+"""Audio device discovery with one shared PortAudio instance
+
+Initializing PortAudio probes every host API (ALSA, JACK, PulseAudio...)
+and is slow, so the instance is created once and the device table is
+read once, then looked up by name, regular expression or index. The
+table is read again only on `rescan`, or when a lookup misses and the
+system's sound devices changed since the last scan (hotplug).
+
+PortAudio only sees new devices after restarting, so `rescan`
+terminates the instance: streams opened from it must be closed first.
+"""
+
+from __future__ import annotations
+
+__all__ = ["COMMON_RATES", "DEVICES", "Device", "Devices", "Query", "parse_query"]
+
+import logging
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from threading import RLock
+from typing import Any, Callable
+
+import pyaudio as pa
+
+logger = logging.getLogger(__name__)
+
+# Sample rates checked by `Devices.rates`
+COMMON_RATES = (8000, 16000, 22050, 32000, 44100, 48000, 88200, 96000)
+
+# Device index, name substring or name pattern
+Query = int | str | re.Pattern[str]
+
+
+@dataclass(frozen=True, slots=True)
+class Device:
+    index: int
+    name: str
+    host_api: int
+    max_input_channels: int
+    max_output_channels: int
+    default_rate: float
+
+    @property
+    def is_input(self) -> bool:
+        return self.max_input_channels > 0
+
+    @classmethod
+    def from_info(cls, info: dict[str, Any]) -> Device:
+        """Make a device from a PyAudio device info dict"""
+
+        return cls(
+            int(info["index"]),
+            str(info["name"]),
+            int(info["hostApi"]),
+            int(info["maxInputChannels"]),
+            int(info["maxOutputChannels"]),
+            float(info["defaultSampleRate"]),
+        )
+
+
+def parse_query(text: str) -> Query:
+    """Device query from user input: "3" (index), "/regex/" or a name"""
+
+    if text.isdigit():
+        return int(text)
+
+    if len(text) > 1 and text.startswith("/") and text.endswith("/"):
+        return re.compile(text[1:-1], re.IGNORECASE)
+
+    return text
+
+
+def _hotplug_token() -> object:
+    """Something that changes when sound devices are added or removed
+
+    None where there's no cheap way to tell (hotplug is not detected).
+    """
+
+    if sys.platform == "linux":
+        try:
+            return Path("/proc/asound/cards").read_text()
+        except OSError:
+            return None
+
+    return None
+
+
+class Devices:
+    """Device table of a shared PortAudio instance
+
+    Args:
+        host_factory: Creates the PortAudio instance
+
+    """
+
+    def __init__(self, host_factory: Callable[[], pa.PyAudio] = pa.PyAudio) -> None:
+        self._host_factory = host_factory
+        self._host: pa.PyAudio | None = None
+        self._devices: list[Device] | None = None
+        self._token: object = None
+
+        # (device, rate, channels, format) -> supported
+        self._formats: dict[tuple[int, int, int, int], bool] = {}
+
+        self._lock = RLock()
+
+    @property
+    def host(self) -> pa.PyAudio:
+        """The PortAudio instance (initialized on first use)"""
+
+        with self._lock:
+            if self._host is None:
+                self._token = _hotplug_token()
+                self._host = self._host_factory()
+
+            return self._host
+
+    @property
+    def devices(self) -> list[Device]:
+        with self._lock:
+            if self._devices is None:
+                host = self.host
+                self._devices = [
+                    Device.from_info(dict(host.get_device_info_by_index(i)))
+                    for i in range(host.get_device_count())
+                ]
+                logger.debug("%d audio devices found", len(self._devices))
+
+            return self._devices
+
+    def inputs(self) -> list[Device]:
+        return [d for d in self.devices if d.is_input]
+
+    def find(self, query: Query, *, input_: bool = True) -> Device | None:
+        """First device matching `query` (an input device, by default)
+
+        Strings match a part of the name, patterns are searched in it.
+        A miss rescans the devices if some were plugged in or removed.
+        """
+
+        device = self._match(query, input_=input_)
+
+        if device is None and self.hotplugged():
+            logger.info("Audio devices changed, rescanning")
+            self.rescan()
+            device = self._match(query, input_=input_)
+
+        return device
+
+    def _match(self, query: Query, *, input_: bool) -> Device | None:
+        candidates = self.inputs() if input_ else self.devices
+
+        for device in candidates:
+            match query:
+                case int():
+                    found = device.index == query
+                case str():
+                    found = query in device.name
+                case _:
+                    found = query.search(device.name) is not None
+
+            if found:
+                return device
+
+        return None
+
+    def supports(
+        self, device: Device, rate: int, channels: int = 1, format_: int = pa.paInt16
+    ) -> bool:
+        """Whether `device` can capture with these settings (cached)"""
+
+        key = (device.index, rate, channels, format_)
+
+        with self._lock:
+            supported = self._formats.get(key)
+
+            if supported is None:
+                try:
+                    supported = bool(
+                        self.host.is_format_supported(
+                            rate,
+                            input_device=device.index,
+                            input_channels=channels,
+                            input_format=format_,
+                        )
+                    )
+                except ValueError:  # Raised instead of returning False
+                    supported = False
+
+                self._formats[key] = supported
+
+            return supported
+
+    def rates(self, device: Device, channels: int = 1) -> list[int]:
+        """Common sample rates `device` can capture at"""
+
+        return [r for r in COMMON_RATES if self.supports(device, r, channels)]
+
+    def hotplugged(self) -> bool:
+        """Whether sound devices changed since the last scan"""
+
+        with self._lock:
+            if self._host is None:
+                return False
+
+            token = _hotplug_token()
+            return token is not None and token != self._token
+
+    def rescan(self) -> None:
+        """Restart PortAudio and read the devices again (on next use)"""
+
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._host is not None:
+                self._host.terminate()
+
+            self._host = None
+            self._devices = None
+            self._formats.clear()
+
+
+DEVICES = Devices()
@@ -0,0 +1,53 @@
+"""Analyzed frames shared with the output services"""
+
+from __future__ import annotations
+
+__all__ = ["Frame"]
+
+from dataclasses import dataclass
+from time import monotonic
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .typing import FloatArray
+
+
+@dataclass(frozen=True, slots=True)
+class Frame:
+    """Immutable snapshot of analyzer output
+
+    Arrays are read-only, so a frame can be handed to any number of
+    threads: publishing a new frame only swaps a reference.
+    """
+
+    index: int
+    timestamp: float  # time.monotonic() at publication
+    data: FloatArray  # Analyzer.get_data(), (size,) or (channels, size)
+    mirrored: FloatArray  # Analyzer.get_data_mirrored(), (2 * size,)
+    beat: bool = False  # An onset was detected in this frame
+    bpm: float = 0.0  # Estimated tempo (0 if unknown)
+
+    @classmethod
+    def create(
+        cls,
+        index: int,
+        data: FloatArray,
+        mirrored: FloatArray,
+        *,
+        beat: bool = False,
+        bpm: float = 0.0,
+    ) -> Frame:
+        """Make a frame from (read-only copies of) the arrays"""
+
+        data = np.array(data, float)
+        mirrored = np.array(mirrored, float)
+        data.flags.writeable = False
+        mirrored.flags.writeable = False
+        return cls(index, monotonic(), data, mirrored, beat, bpm)
+
+    @classmethod
+    def empty(cls, size: int, channels: int = 1) -> Frame:
+        shape = (size,) if channels == 1 else (channels, size)
+        return cls.create(0, np.zeros(shape, float), np.zeros(2 * size, float))
@@ -0,0 +1,241 @@
+"""Adapt the analysis cost to the hardware
+
+The governor paces the main loop to a target frame rate and measures
+the CPU time every frame takes to compute (time blocked on the audio
+device doesn't count). When frames use more than the CPU budget, or
+the audio device overflows, it steps down a quality ladder: a shorter
+FFT, a narrower smoothing window, a slower send rate and fewer frames
+per second. When there is plenty of headroom again, it steps back up.
+
+Sources that block on reads (`AudioSource.blocking`) pace the loop
+themselves: they overflow when read late, so their frame rate is kept.
+"""
+
+from __future__ import annotations
+
+__all__ = ["DEFAULT_LADDER", "Decision", "Governor", "Quality"]
+
+import logging
+from dataclasses import dataclass
+from time import thread_time
+from typing import TYPE_CHECKING, Iterable
+
+from .ring import RingBuffer
+from .scheduler import FrameScheduler
+
+if TYPE_CHECKING:
+    from .analyzer import Analyzer
+    from .service import VAudioService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Quality:
+    fft_divisor: int  # FFT size = chunk / fft_divisor
+    smoothing: int  # Analyzer.smoothing
+    send_interval: float  # VAudioService.send_interval
+    rate_divisor: int = 1  # Frames per second = target_fps / rate_divisor
+
+
+DEFAULT_LADDER = (
+    Quality(1, 2, 0.05),
+    Quality(2, 2, 0.05),
+    Quality(2, 1, 0.066),
+    Quality(4, 1, 0.1, 2),
+)
+
+
+@dataclass(frozen=True)
+class Decision:
+    frame: int
+    old: int  # Quality levels (indices in the ladder)
+    new: int
+    load: float  # Mean CPU time of a frame / frame interval
+    reason: str
+
+
+class Governor:
+    """Pace the main loop and adapt the quality to the measured load
+
+    Usage:
+        while ...:
+            governor.wait()
+            with governor.measure():
+                analyzer.update()
+                analyzer.publish()
+
+    Args:
+        analyzer: Analyzer to adapt
+        services: Services whose send rate to adapt
+        target_fps: Frames analyzed per second at the best quality (sources
+            that block on reads keep their own frame rate)
+        cpu_budget: Part of every frame interval the analysis may take
+        window: Frames averaged per decision
+        ladder: Quality levels, from the best to the cheapest
+
+    """
+
+    def __init__(
+        self,
+        analyzer: Analyzer,
+        services: Iterable[VAudioService] = (),
+        target_fps: float = 30.0,
+        cpu_budget: float = 0.5,
+        window: int = 30,
+        ladder: tuple[Quality, ...] = DEFAULT_LADDER,
+    ) -> None:
+        self.analyzer = analyzer
+        self.services = list(services)
+        self.target_fps = target_fps
+        self.cpu_budget = cpu_budget
+        self.ladder = ladder
+
+        self.level: int = 0
+        self.frames: int = 0
+        self.decisions: list[Decision] = []
+
+        self._scheduler = FrameScheduler(1 / target_fps)
+        self._costs = RingBuffer(window)
+        self._window = window
+        self._overruns: int = self._audio_overruns()
+
+        self._apply(self.ladder[0])
+
+    @property
+    def quality(self) -> Quality:
+        return self.ladder[self.level]
+
+    @property
+    def fps(self) -> float:
+        """Frames analyzed per second at the current quality"""
+
+        audio = self.analyzer.audio
+
+        if audio.blocking:
+            return audio.frame_rate
+
+        return self.target_fps / self.quality.rate_divisor
+
+    @property
+    def frame_rate(self) -> float:
+        """Frames analyzed per second of audio
+
+        Lower than the source's frame rate when a live source is read
+        less often (see `AudioSource.live`).
+        """
+
+        audio = self.analyzer.audio
+
+        if audio.live:
+            return min(self.fps, audio.frame_rate)
+
+        return audio.frame_rate
+
+    @property
+    def load(self) -> float:
+        """Mean CPU time of the last frames, relative to the frame interval"""
+
+        return self._costs.mean * self.fps
+
+    def wait(self) -> None:
+        """Sleep until the next frame is due (blocking sources wait on reads)"""
+
+        if not self.analyzer.audio.blocking:
+            self._scheduler.wait()
+
+    def measure(self) -> _Measure:
+        """Measure the CPU time of computing a frame (context manager)"""
+
+        return _Measure(self)
+
+    def record(self, cost: float) -> None:
+        """Account for a frame that took `cost` seconds of CPU time"""
+
+        self._costs.push(cost)
+        self.frames += 1
+
+        if self.frames % self._window == 0:
+            self._decide()
+
+    def _audio_overruns(self) -> int:
+        return getattr(self.analyzer.audio, "overruns", 0)
+
+    def _decide(self) -> None:
+        load = self.load
+
+        overruns = self._audio_overruns()
+        overran = overruns - self._overruns
+        self._overruns = overruns
+
+        if load > self.cpu_budget:
+            self._set_level(self.level + 1, load, "over CPU budget")
+        elif overran:
+            self._set_level(self.level + 1, load, f"{overran} audio overruns")
+        elif self.level > 0 and self._fits(self.level - 1, load):
+            self._set_level(self.level - 1, load, "headroom")
+
+    def _fits(self, level: int, load: float) -> bool:
+        """Would the load at `level` stay well within the budget?"""
+
+        # The FFT dominates: its cost scales with its size (and the load
+        # with the frame rate)
+        current, other = self.quality, self.ladder[level]
+        ratio = current.fft_divisor / other.fft_divisor
+
+        if not self.analyzer.audio.blocking:
+            ratio *= current.rate_divisor / other.rate_divisor
+
+        return load * max(ratio, 1.0) < self.cpu_budget * 0.5
+
+    def _set_level(self, level: int, load: float, reason: str) -> None:
+        level = min(max(level, 0), len(self.ladder) - 1)
+
+        if level == self.level:
+            return
+
+        decision = Decision(self.frames, self.level, level, load, reason)
+        self.decisions.append(decision)
+
+        self.level = level
+        self._apply(self.quality)
+
+        logger.info(
+            "Quality %d -> %d (%s, load %.0f%%):"
+            " FFT %d, smoothing %d, send every %.0f ms, %.0f FPS",
+            decision.old,
+            decision.new,
+            reason,
+            load * 100,
+            self.analyzer.audio.fft_size,
+            self.quality.smoothing,
+            self.quality.send_interval * 1000,
+            self.fps,
+        )
+
+    def _apply(self, quality: Quality) -> None:
+        audio = self.analyzer.audio
+        audio.fft_size = max(audio.chunk // quality.fft_divisor, 1)
+
+        self.analyzer.smoothing = quality.smoothing
+        self._scheduler.interval = quality.rate_divisor / self.target_fps
+
+        # Beat detection and fades count in frames
+        self.analyzer.set_frame_rate(self.frame_rate)
+
+        for service in self.services:
+            service.send_interval = quality.send_interval
+
+
+class _Measure:
+    __slots__ = ("_governor", "_start")
+
+    def __init__(self, governor: Governor) -> None:
+        self._governor = governor
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = thread_time()
+
+    def __exit__(self, *_: object) -> None:
+        self._governor.record(thread_time() - self._start)
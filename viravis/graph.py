@@ -1,10 +1,62 @@
+"""Bar graphs in the terminal
+
+Values are bar heights in rows (fractions are drawn with eighth-block
+glyphs by `Graph`). The character grid is built with NumPy: cell fill
+levels are an index into a glyph table, and every row is joined at once
+by viewing the (rows, width) array of characters as one string per row.
+"""
+
 from __future__ import annotations
 
-from typing import Iterable
+__all__ = ["Graph", "graph"]
+
+import sys
+from typing import TYPE_CHECKING, Iterable, TextIO
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .typing import FloatArray
 
 # full, empty = "▮▯"
 full, empty = "▉░"
 
+EIGHTHS = " ▁▂▃▄▅▆▇█"
+
+
+def _values(data: Iterable[int | float]) -> FloatArray:
+    if isinstance(data, np.ndarray):
+        values = data.astype(float, copy=False).ravel()
+    else:
+        # Also takes generators and other one-shot iterables
+        values = np.fromiter(data, float)
+
+    # NaN (e.g. silence normalized by 0) is drawn as an empty column
+    return np.nan_to_num(values, nan=0.0)
+
+
+def _rows(values: FloatArray, height: int, glyphs: str) -> list[str]:
+    """Rows of the graph, from the top, as strings of `glyphs`
+
+    `glyphs[0]` is an empty cell and `glyphs[-1]` a full one, the ones
+    in between are drawn for partially filled cells.
+    """
+
+    levels = len(glyphs) - 1
+
+    # Fill of every cell (rows from the top), in steps of 1 / levels
+    bottom = np.arange(height - 1, -1, -1, dtype=float)[:, np.newaxis]
+    fill = np.clip(values - bottom, 0, 1)
+    index = np.floor(fill * levels + 1e-9).astype(np.intp)
+
+    table = np.array(list(glyphs))
+    cells = np.ascontiguousarray(table[index])
+
+    if cells.shape[1] == 0:
+        return [""] * height
+
+    return cells.view(f"<U{cells.shape[1]}").ravel().tolist()
+
 
 def graph(data: Iterable[int | float], max_length: int, *, clear: bool = False) -> None:
     """Print a graph based on the input data.
@@ -15,14 +67,75 @@ def graph(data: Iterable[int | float], max_length: int, *, clear: bool = False)
         clear: Whether to clear the console before printing the graph.
 
     """
-    graph_string = ""
-
-    for y in range(max_length):
-        for x in data:
-            graph_string += full if (max_length - x) <= y else empty
-
-        graph_string += "\n"
+    rows = _rows(_values(data), max_length, empty + full)
+    graph_string = "".join(row + "\n" for row in rows)
 
     if clear:
         graph_string = f"\x1b[{max_length + 1}A\x1b[2K" + graph_string
     print(graph_string, end="")  # noqa: T201
+
+
+class Graph:
+    """Graph redrawn in place, only the rows that changed
+
+    The first frame is printed below the cursor, the following ones
+    move the cursor up to the changed rows and back below the graph.
+
+    Args:
+        height: Number of rows
+        eighths: Draw fractions of a row (otherwise full/empty cells)
+        stream: Where to write (default: stdout)
+
+    """
+
+    def __init__(
+        self, height: int, *, eighths: bool = True, stream: TextIO | None = None
+    ) -> None:
+        self.height = height
+        self.glyphs = EIGHTHS if eighths else empty + full
+        self.stream = stream
+
+        self._rows: list[str] | None = None  # Rows on the screen
+
+    def render(self, data: Iterable[int | float]) -> str:
+        """Escape sequences and text that update the graph to `data`"""
+
+        rows = _rows(_values(data), self.height, self.glyphs)
+        previous, self._rows = self._rows, rows
+
+        if previous is None:
+            return "".join(row + "\n" for row in rows)
+
+        out: list[str] = []
+        line = self.height  # Cursor line (below the graph)
+
+        for i, (row, old) in enumerate(zip(rows, previous, strict=True)):
+            if row != old:
+                out.append(_move(i - line))
+                out.append(row + "\x1b[K")  # Erase the rest of a longer row
+                line = i
+
+        if out:
+            out.append(_move(self.height - line))
+
+        return "".join(out)
+
+    def draw(self, data: Iterable[int | float]) -> None:
+        stream = self.stream or sys.stdout
+        stream.write(self.render(data))
+        stream.flush()
+
+    def reset(self) -> None:
+        """Print the whole graph again on the next `draw`"""
+
+        self._rows = None
+
+
+def _move(lines: int) -> str:
+    """Move the cursor to the start of a line `lines` down (up if < 0)"""
+
+    if lines < 0:
+        return f"\x1b[{-lines}F"
+    if lines > 0:
+        return f"\x1b[{lines}E"
+    return "\r"
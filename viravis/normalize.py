@@ -0,0 +1,100 @@
+"""Output level normalization with O(1) running aggregates"""
+
+from __future__ import annotations
+
+__all__ = ["Normalizer", "SlidingMax", "Statistic"]
+
+from collections import deque
+from typing import Literal
+
+from .ring import RingBuffer
+
+Statistic = Literal["mean", "max"]
+
+
+class SlidingMax:
+    """Maximum of the last `window` values
+
+    Keeps a monotonic deque of the values that can still become the
+    maximum, so `push` is amortized O(1).
+    """
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+
+        self._count: int = 0
+        self._candidates: deque[tuple[int, float]] = deque()  # Decreasing values
+
+    def push(self, value: float) -> None:
+        candidates = self._candidates
+
+        while candidates and candidates[-1][1] <= value:
+            candidates.pop()
+
+        candidates.append((self._count, value))
+
+        if candidates[0][0] <= self._count - self.window:
+            candidates.popleft()
+
+        self._count += 1
+
+    @property
+    def max(self) -> float:
+        return self._candidates[0][1] if self._candidates else 0.0
+
+
+class Normalizer:
+    """Track the level that analyzer output is divided by
+
+    Analyzers push the peak of their (normalized) output, so the level
+    settles where it equals that peak. With the "max" statistic set a
+    decay: the level would otherwise drop at once whenever the highest
+    peak leaves the window, and then overshoot back up.
+
+    Args:
+        window: Number of frame peaks the level is computed from
+        statistic: Mean or maximum of those peaks
+        decay: If set, the level follows rises at once but falls by
+            at most this factor per frame (0-1, e.g. 0.99)
+        floor: Lowest peak taken into account
+
+    """
+
+    def __init__(
+        self,
+        window: int = 100,
+        statistic: Statistic = "mean",
+        decay: float | None = None,
+        floor: float = 1.0,
+    ) -> None:
+        if decay is not None and not 0 < decay <= 1:
+            msg = f"Decay must be between 0 and 1, not {decay}"
+            raise ValueError(msg)
+
+        self.window = window
+        self.statistic: Statistic = statistic
+        self.decay = decay
+        self.floor = floor
+
+        self.level: float = 1.0
+
+        self._mean = RingBuffer(window)
+        self._max = SlidingMax(window)
+
+    def push(self, peak: float) -> float:
+        """Account for the peak of a new frame, returns the new level"""
+
+        peak = max(peak, self.floor)
+
+        if self.statistic == "max":
+            self._max.push(peak)
+            level = self._max.max
+        else:
+            self._mean.push(peak)
+            level = self._mean.mean
+
+        if self.decay is not None:
+            level = max(level, self.level * self.decay)
+
+        self.level = level
+        return level
@@ -0,0 +1,223 @@
+"""Binary serial frame formats
+
+Frame layout:
+
+    SYNC (2 bytes) | LENGTH (uint16, little-endian) | PAYLOAD (LENGTH bytes) | CRC
+
+CRC is CRC-16/XMODEM (big-endian) of LENGTH and PAYLOAD, the same as
+`_crc_xmodem_update` from avr-libc.
+
+Plain frames (`SYNC`) carry one uint8 per value. Delta-coded frames
+(`SYNC_DELTA`) start with a frame type:
+
+    'K' | VALUES (uint8 each)                        - keyframe
+    'D' | RUN...                                     - delta frame
+          RUN = START (uint16 LE) | COUNT (uint8) | VALUES (COUNT x uint8)
+
+A delta frame only carries the runs of values that changed since the
+previous frame, the rest of the strip keeps its values.
+"""
+
+from __future__ import annotations
+
+__all__ = [
+    "SYNC",
+    "SYNC_DELTA",
+    "DeltaDecoder",
+    "DeltaEncoder",
+    "FrameError",
+    "decode_binary",
+    "encode_binary",
+    "to_uint8",
+]
+
+import binascii
+import struct
+from typing import TYPE_CHECKING, Iterable
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+SYNC = b"\xa5\x5a"
+SYNC_DELTA = b"\xa5\x5b"
+MAX_LENGTH = 0xFFFF
+
+KEYFRAME = b"K"
+DELTA = b"D"
+
+_HEADER = struct.Struct("<2sH")
+_CRC = struct.Struct(">H")
+_RUN = struct.Struct("<HB")
+_MAX_RUN = 0xFF
+
+
+class FrameError(ValueError):
+    """Malformed binary frame"""
+
+
+def to_uint8(data: Iterable[int | float]) -> npt.NDArray[np.uint8]:
+    """Round values and constrain them between 0 and 255 (NaN -> 0)"""
+
+    arr = np.asarray(data, dtype=float)
+    arr = np.nan_to_num(arr, nan=0.0)
+    return np.clip(np.rint(arr), 0, 255).astype(np.uint8)
+
+
+def _pack(sync: bytes, payload: bytes) -> bytes:
+    if len(payload) > MAX_LENGTH:
+        msg = f"Frame too long: {len(payload)} bytes"
+        raise FrameError(msg)
+
+    header = _HEADER.pack(sync, len(payload))
+    crc = binascii.crc_hqx(header[2:] + payload, 0)
+    return header + payload + _CRC.pack(crc)
+
+
+def _unpack(frame: bytes, sync: bytes) -> bytes:
+    if len(frame) < _HEADER.size + _CRC.size:
+        msg = "Frame too short"
+        raise FrameError(msg)
+
+    sync_, length = _HEADER.unpack_from(frame)
+
+    if sync_ != sync:
+        msg = "Bad sync header"
+        raise FrameError(msg)
+
+    end = _HEADER.size + length
+
+    if len(frame) != end + _CRC.size:
+        msg = f"Frame length mismatch: expected {length} bytes"
+        raise FrameError(msg)
+
+    (crc,) = _CRC.unpack_from(frame, end)
+
+    if binascii.crc_hqx(frame[2:end], 0) != crc:
+        msg = "CRC mismatch"
+        raise FrameError(msg)
+
+    return frame[_HEADER.size : end]
+
+
+def encode_binary(data: Iterable[int | float]) -> bytes:
+    """Pack values into a binary frame"""
+
+    return _pack(SYNC, to_uint8(data).tobytes())
+
+
+def decode_binary(frame: bytes) -> npt.NDArray[np.uint8]:
+    """Unpack values from a binary frame"""
+
+    return np.frombuffer(_unpack(frame, SYNC), np.uint8)
+
+
+class DeltaEncoder:
+    """Encode values as keyframes and run-length coded delta frames
+
+    The encoder tracks the values the receiver has, so quantization
+    error (`threshold`) never accumulates.
+
+    Args:
+        keyframe_interval: Send a keyframe at least every N frames
+            (to resync receivers that missed a frame)
+        threshold: Don't send values that changed by this much or less
+        merge_gap: Merge runs separated by this many unchanged values
+            (a new run costs 3 bytes of header)
+
+    """
+
+    def __init__(
+        self, keyframe_interval: int = 50, threshold: int = 0, merge_gap: int = 3
+    ) -> None:
+        self.keyframe_interval = keyframe_interval
+        self.threshold = threshold
+        self.merge_gap = merge_gap
+
+        self._reference: npt.NDArray[np.uint8] | None = None
+        self._since_keyframe: int = 0
+
+    def reset(self) -> None:
+        """Start over with a keyframe (e.g. after the receiver reconnected)"""
+
+        self._reference = None
+
+    def encode(self, data: Iterable[int | float]) -> bytes:
+        values = to_uint8(data)
+        reference = self._reference
+
+        if (
+            reference is None
+            or reference.shape != values.shape
+            or self._since_keyframe >= self.keyframe_interval
+        ):
+            return self._keyframe(values)
+
+        changed = np.abs(values.astype(np.int16) - reference) > self.threshold
+        index = np.flatnonzero(changed)
+
+        # Split changed positions into runs [start, end)
+        breaks = np.flatnonzero(np.diff(index) > self.merge_gap + 1) + 1
+        starts = index[np.r_[0, breaks]] if index.size else index
+        ends = index[np.r_[breaks - 1, -1]] + 1 if index.size else index
+
+        payload = bytearray(DELTA)
+
+        for start, end in zip(starts.tolist(), ends.tolist(), strict=True):
+            for run_start in range(start, end, _MAX_RUN):
+                run_end = min(run_start + _MAX_RUN, end)
+                payload += _RUN.pack(run_start, run_end - run_start)
+                payload += values[run_start:run_end].tobytes()
+                reference[run_start:run_end] = values[run_start:run_end]
+
+        if len(payload) > values.size + 1:
+            return self._keyframe(values)
+
+        self._since_keyframe += 1
+        return _pack(SYNC_DELTA, bytes(payload))
+
+    def _keyframe(self, values: npt.NDArray[np.uint8]) -> bytes:
+        self._reference = values.copy()
+        self._since_keyframe = 0
+        return _pack(SYNC_DELTA, KEYFRAME + values.tobytes())
+
+
+class DeltaDecoder:
+    """Reconstruct values from `DeltaEncoder` frames"""
+
+    def __init__(self) -> None:
+        self.values: npt.NDArray[np.uint8] | None = None
+
+    def decode(self, frame: bytes) -> npt.NDArray[np.uint8]:
+        payload = _unpack(frame, SYNC_DELTA)
+        kind, body = payload[:1], payload[1:]
+
+        if kind == KEYFRAME:
+            self.values = np.frombuffer(body, np.uint8).copy()
+            return self.values
+
+        if kind != DELTA:
+            msg = f"Unknown frame type: {kind!r}"
+            raise FrameError(msg)
+
+        if self.values is None:
+            msg = "Delta frame before the first keyframe"
+            raise FrameError(msg)
+
+        offset = 0
+
+        while offset < len(body):
+            start, count = _RUN.unpack_from(body, offset)
+            offset += _RUN.size
+
+            if start + count > self.values.size or offset + count > len(body):
+                msg = "Run out of bounds"
+                raise FrameError(msg)
+
+            self.values[start : start + count] = np.frombuffer(
+                body, np.uint8, count, offset
+            )
+            offset += count
+
+        return self.values
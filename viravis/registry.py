@@ -0,0 +1,127 @@
+"""Analyzers (modes) and output services by name
+
+Built-in entries are import paths, other packages add their own with
+entry points:
+
+    [tool.poetry.plugins."viravis.analyzers"]
+    "sparkle" = "my_package.sparkle:AnalyzerSparkle"
+
+Nothing is imported until an entry is loaded, so selecting a mode or a
+service only imports the dependencies that one needs (PyAudio, pyserial,
+saaba...).
+"""
+
+from __future__ import annotations
+
+__all__ = ["ANALYZERS", "SERVICES", "Registry"]
+
+import logging
+from importlib import import_module
+from importlib.metadata import EntryPoint, entry_points
+from typing import TYPE_CHECKING, Any, Callable, Generic, Mapping, TypeVar
+
+if TYPE_CHECKING:
+    from .analyzer import Analyzer
+    from .service import VAudioService
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Registry(Generic[T]):
+    """Named classes (or factories), imported when they are first loaded
+
+    Args:
+        group: Entry point group other packages register entries in
+        builtins: Name -> "module:attribute" of the built-in entries
+            (they take precedence over entry points)
+
+    """
+
+    def __init__(self, group: str, builtins: Mapping[str, str]) -> None:
+        self.group = group
+        self.builtins: frozenset[str] = frozenset(builtins)
+
+        self._entries: dict[str, str | EntryPoint | T] = dict(builtins)
+        self._discovered: bool = False
+
+    def _discover(self) -> None:
+        if self._discovered:
+            return
+
+        self._discovered = True
+
+        for entry in entry_points(group=self.group):
+            if entry.name in self._entries:
+                logger.warning(
+                    "%s `%s` from %s is shadowed", self.group, entry.name, entry.value
+                )
+                continue
+
+            self._entries[entry.name] = entry
+
+    def register(self, name: str, target: str | T) -> None:
+        """Add an entry: an object or its "module:attribute" path"""
+
+        self._entries[name] = target
+
+    def names(self) -> list[str]:
+        self._discover()
+        return list(self._entries)
+
+    def plugins(self) -> list[str]:
+        """Names of the entries that are not built in"""
+
+        return [name for name in self.names() if name not in self.builtins]
+
+    def __contains__(self, name: str) -> bool:
+        self._discover()
+        return name in self._entries
+
+    def load(self, name: str) -> T:
+        """Import (once) and return the entry"""
+
+        self._discover()
+
+        try:
+            target = self._entries[name]
+        except KeyError:
+            msg = f"Unknown {self.group} entry: {name} (one of {self.names()})"
+            raise ValueError(msg) from None
+
+        match target:
+            case EntryPoint():
+                loaded: Any = target.load()
+            case str():
+                module, _, attribute = target.partition(":")
+                loaded = getattr(import_module(module), attribute)
+            case _:
+                return target
+
+        self._entries[name] = loaded
+        return loaded
+
+
+# Called as `cls(size, audio, normalizer, beat)`
+ANALYZERS: Registry[type[Analyzer]] = Registry(
+    "viravis.analyzers",
+    {
+        "fft": "viravis.analyzer:AnalyzerFFT",
+        "rolling": "viravis.analyzer:AnalyzerRolling",
+        "rollingease": "viravis.analyzer:AnalyzerRollingEase",
+        "flat": "viravis.analyzer:AnalyzerFlat",
+        "pulse": "viravis.analyzer:AnalyzerPulse",
+    },
+)
+
+# Called as `factory(analyzer)` (built-ins take more, keyword arguments)
+SERVICES: Registry[Callable[..., VAudioService]] = Registry(
+    "viravis.services",
+    {
+        "serial": "viravis.vaudio:VAudioSerial",
+        "http": "viravis.vaudio:VAudioHttpServer",
+        "stream": "viravis.stream:VAudioStreamServer",
+        "udp": "viravis.udp:VAudioUdp",
+    },
+)
@@ -0,0 +1,137 @@
+"""Preallocated ring buffers"""
+
+from __future__ import annotations
+
+__all__ = ["RingBuffer", "SampleRing"]
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .typing import FloatArray, SampleArray
+
+
+class SampleRing:
+    """Ring buffer of audio samples with a single writer
+
+    The writer copies a block first and advances `written` after, so
+    readers need no lock: a read is retried if the writer lapped it
+    while copying. With several channels, blocks are (n, channels).
+    """
+
+    def __init__(self, capacity: int, channels: int = 1) -> None:
+        self.capacity = capacity
+        self.channels = channels
+        self.written: int = 0  # Total number of samples ever written
+
+        shape = (capacity,) if channels == 1 else (capacity, channels)
+        self._buffer: FloatArray = np.zeros(shape, float)
+
+    def write(self, block: SampleArray) -> None:
+        """Append samples (called from the producer thread only)"""
+
+        n = len(block)
+
+        if n > self.capacity:
+            self.written += n - self.capacity
+            block = block[-self.capacity :]
+            n = self.capacity
+
+        start = self.written % self.capacity
+        end = start + n
+
+        if end <= self.capacity:
+            self._buffer[start:end] = block
+        else:
+            split = self.capacity - start
+            self._buffer[start:] = block[:split]
+            self._buffer[: n - split] = block[split:]
+
+        self.written += n
+
+    def read_latest(self, out: FloatArray) -> int:
+        """Copy the latest `len(out)` samples into `out`
+
+        Samples not written yet are read as zeros.
+
+        Returns:
+            Total written count at the end of the copied window
+
+        """
+
+        n = len(out)
+
+        if n > self.capacity:
+            msg = f"Can't read {n} samples from a ring of {self.capacity}"
+            raise ValueError(msg)
+
+        while True:
+            end = self.written
+            available = min(end, n)
+
+            out[: n - available] = 0
+
+            start = (end - available) % self.capacity
+            stop = start + available
+
+            if stop <= self.capacity:
+                out[n - available :] = self._buffer[start:stop]
+            else:
+                split = self.capacity - start
+                out[n - available : n - available + split] = self._buffer[start:]
+                out[n - available + split :] = self._buffer[: stop - self.capacity]
+
+            # The writer may have overwritten the oldest samples meanwhile
+            if self.written - end <= self.capacity - n:
+                return end
+
+
+class RingBuffer:
+    """Fixed-size circular buffer of numbers with a running mean
+
+    `push` is O(1): the sum is updated incrementally (and recomputed
+    once per lap, so float error doesn't accumulate).
+    """
+
+    def __init__(self, capacity: int, fill: float = 0.0) -> None:
+        self.capacity = capacity
+
+        self._buffer: FloatArray = np.full(capacity, fill, float)
+        self._head: int = 0  # Index of the oldest value (next to overwrite)
+        self._sum: float = fill * capacity
+
+    def push(self, value: float) -> None:
+        """Replace the oldest value"""
+
+        self._sum += value - self._buffer[self._head]
+        self._buffer[self._head] = value
+        self._head += 1
+
+        if self._head == self.capacity:
+            self._head = 0
+            self._sum = float(self._buffer.sum())
+
+    @property
+    def last(self) -> float:
+        """Most recently pushed value"""
+
+        return float(self._buffer[self._head - 1])
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self.capacity
+
+    def array(self, out: FloatArray | None = None) -> FloatArray:
+        """Values from the newest to the oldest"""
+
+        if out is None:
+            out = np.empty(self.capacity, float)
+
+        out[: self._head] = self._buffer[: self._head][::-1]
+        out[self._head :] = self._buffer[self._head :][::-1]
+        return out
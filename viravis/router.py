@@ -0,0 +1,116 @@
+"""Fan one analyzed frame out to several strips
+
+Outputs are described in a JSON file:
+
+    {
+        "outputs": [
+            {"port": "/dev/ttyUSB0", "size": 60, "start": 0.0, "end": 0.5},
+            {"port": "/dev/ttyUSB1", "size": 144, "start": 0.5, "mirror": false}
+        ]
+    }
+
+`start` and `end` select a part of the spectrum (0-1), which is
+resampled to `size` values (and mirrored to `2 * size` by default).
+"""
+
+from __future__ import annotations
+
+__all__ = ["OutputSpec", "Segment", "SerialFormat", "load_outputs"]
+
+import json
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal, get_args
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .frame import Frame
+    from .typing import FloatArray, IntArray
+
+SerialFormat = Literal["text", "binary", "delta"]
+
+
+@dataclass(frozen=True)
+class OutputSpec:
+    port: str
+    size: int
+    start: float = 0.0
+    end: float = 1.0
+    mirror: bool = True
+    serial_format: SerialFormat = "text"
+    baudrate: int = 115200
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> OutputSpec:
+        known = {f.name for f in fields(cls)}
+        unknown = set(d) - known
+
+        if unknown:
+            msg = f"Unknown output options: {', '.join(sorted(unknown))}"
+            raise ValueError(msg)
+
+        spec = cls(**d)
+
+        if not 0 <= spec.start < spec.end <= 1:
+            msg = f"Bad segment of {spec.port}: {spec.start}-{spec.end}"
+            raise ValueError(msg)
+
+        if spec.size <= 0:
+            msg = f"Bad size of {spec.port}: {spec.size}"
+            raise ValueError(msg)
+
+        if spec.serial_format not in get_args(SerialFormat):
+            msg = f"Bad serial format of {spec.port}: {spec.serial_format}"
+            raise ValueError(msg)
+
+        return spec
+
+
+def load_outputs(path: str | Path) -> list[OutputSpec]:
+    """Read output specs from a JSON config file"""
+
+    with Path(path).open() as f:
+        config = json.load(f)
+
+    return [OutputSpec.from_dict(d) for d in config["outputs"]]
+
+
+class Segment:
+    """Resample a part of the frame to the strip length
+
+    Interpolation indices and weights are computed once per input
+    length, a frame is then a gather and a multiply-add.
+    """
+
+    def __init__(self, spec: OutputSpec) -> None:
+        self.spec = spec
+
+        self._n: int = -1
+        self._lo: IntArray
+        self._hi: IntArray
+        self._w: FloatArray
+
+    def _prepare(self, n: int) -> None:
+        spec = self.spec
+        x = np.linspace(spec.start * (n - 1), spec.end * (n - 1), spec.size)
+        self._lo = np.floor(x).astype(np.int64)
+        self._hi = np.minimum(self._lo + 1, n - 1)
+        self._w = x - self._lo
+        self._n = n
+
+    def __call__(self, frame: Frame) -> FloatArray:
+        # The right half of the mirrored frame is what a single strip shows
+        mirrored = frame.mirrored
+        data = mirrored[len(mirrored) // 2 :]
+
+        if len(data) != self._n:
+            self._prepare(len(data))
+
+        lo = data[self._lo]
+        values = lo + (data[self._hi] - lo) * self._w
+
+        if self.spec.mirror:
+            return np.concatenate((np.flip(values), values))
+
+        return values
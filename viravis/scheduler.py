@@ -0,0 +1,49 @@
+"""Fixed-rate frame pacing"""
+
+from __future__ import annotations
+
+__all__ = ["FrameScheduler"]
+
+from time import monotonic, sleep
+
+
+class FrameScheduler:
+    """Sleep until the next tick of a fixed-rate monotonic clock
+
+    Deadlines are `start + n * interval`, so the time spent between
+    `wait` calls doesn't make the rate drift. If the caller falls behind
+    by more than a tick, the missed ticks are skipped (and counted)
+    instead of being sent in a burst.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.missed: int = 0
+
+        self._deadline: float | None = None
+
+    def reset(self) -> None:
+        """Start a new schedule on the next `wait`"""
+
+        self._deadline = None
+
+    def wait(self) -> None:
+        """Sleep until the next tick"""
+
+        now = monotonic()
+
+        if self._deadline is None:
+            self._deadline = now
+            return
+
+        self._deadline += self.interval
+
+        if now - self._deadline > self.interval:
+            skipped = int((now - self._deadline) // self.interval)
+            self.missed += skipped
+            self._deadline += skipped * self.interval
+
+        delay = self._deadline - now
+
+        if delay > 0:
+            sleep(delay)
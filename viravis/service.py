@@ -0,0 +1,54 @@
+"""Base class for output services"""
+
+from __future__ import annotations
+
+__all__ = ["Sync", "VAudioService"]
+
+from typing import TYPE_CHECKING, Iterator, Literal
+
+from .scheduler import FrameScheduler
+
+if TYPE_CHECKING:
+    from .analyzer import Analyzer
+    from .frame import Frame
+
+Sync = Literal["interval", "frame"]
+
+
+class VAudioService:
+    def __init__(self, analyzer: Analyzer) -> None:
+        self.analyzer = analyzer
+        self.running: bool = False
+
+        self.send_interval: float = 0.05
+        self.sync: Sync = "interval"
+
+    def run(self) -> None:
+        self.running = True
+
+    def stop(self) -> None:
+        self.running = False
+
+    def frames(self) -> Iterator[Frame]:
+        """Yield frames to send while the service is running
+
+        With `sync == "interval"` the latest frame is yielded every
+        `send_interval` seconds, with `sync == "frame"` every frame is
+        yielded as soon as it is published.
+        """
+
+        scheduler = FrameScheduler(self.send_interval)
+        last: int = 0
+
+        while self.running:
+            if self.sync == "frame":
+                frame = self.analyzer.wait_frame(last, timeout=0.5)
+                if frame.index == last:
+                    continue
+            else:
+                scheduler.interval = self.send_interval
+                scheduler.wait()
+                frame = self.analyzer.frame
+
+            last = frame.index
+            yield frame
@@ -0,0 +1,240 @@
+"""Run the output services in their own processes
+
+The analysis process writes every frame into a shared memory block,
+under a lock shared with the service processes, and bumps a sequence
+counter. Services copy the latest frame out under the same lock (the
+lock orders the stores, on any CPU), so frames are never pickled and
+the writer only ever waits for a copy. A condition on that lock wakes
+the services up when a frame is published.
+"""
+
+from __future__ import annotations
+
+__all__ = ["FrameReader", "SharedFrames", "start_service"]
+
+import logging
+from multiprocessing import Condition, Process
+from multiprocessing.shared_memory import SharedMemory
+from threading import Thread
+from time import monotonic
+from typing import TYPE_CHECKING, Callable, cast
+
+import numpy as np
+
+from .frame import Frame
+from .metrics import METRICS
+
+if TYPE_CHECKING:
+    from multiprocessing.synchronize import Condition as ConditionType
+    from multiprocessing.synchronize import Event
+
+    from .analyzer import Analyzer
+    from .service import VAudioService
+
+logger = logging.getLogger(__name__)
+
+# Sequence, frame index, timestamp, beat, tempo, then data
+# (channels * size) and mirrored (2 * size)
+_HEADER_SIZE = 40
+
+
+class SharedFrames:
+    """Latest frame of size `size`, in a shared memory block
+
+    Creates the block (and its `condition`) if `name` is None, otherwise
+    attaches to it, given the creator's `condition`.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        name: str | None = None,
+        channels: int = 1,
+        condition: ConditionType | None = None,
+    ) -> None:
+        if name is not None and condition is None:
+            msg = "Attaching to shared frames requires their condition"
+            raise ValueError(msg)
+
+        self.size = size
+        self.channels = channels
+        self.condition: ConditionType = Condition() if condition is None else condition
+
+        data_shape = (size,) if channels == 1 else (channels, size)
+        data_size = size * channels * 8
+
+        self._shm = SharedMemory(
+            name, create=name is None, size=_HEADER_SIZE + data_size + 2 * size * 8
+        )
+        self._owner = name is None
+
+        buf = self._shm.buf
+        self._seq = np.ndarray((1,), np.int64, buf, 0)
+        self._index = np.ndarray((1,), np.int64, buf, 8)
+        self._timestamp = np.ndarray((1,), np.float64, buf, 16)
+        self._beat = np.ndarray((1,), np.int64, buf, 24)
+        self._bpm = np.ndarray((1,), np.float64, buf, 32)
+        self._data = np.ndarray(data_shape, np.float64, buf, _HEADER_SIZE)
+        self._mirrored = np.ndarray(
+            (2 * size,), np.float64, buf, _HEADER_SIZE + data_size
+        )
+
+        if self._owner:
+            self._seq[0] = 0
+            self._index[0] = 0
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def sequence(self) -> int:
+        """Number of frames published (read without the lock, as a hint)"""
+
+        return int(self._seq[0])
+
+    def write(self, frame: Frame) -> None:
+        """Publish a frame and wake the waiting readers up"""
+
+        with self.condition:
+            # Arrays first: a frame of the wrong shape is rejected whole
+            self._data[:] = frame.data
+            self._mirrored[:] = frame.mirrored
+
+            self._index[0] = frame.index
+            self._timestamp[0] = frame.timestamp
+            self._beat[0] = frame.beat
+            self._bpm[0] = frame.bpm
+            self._seq[0] += 1
+
+            self.condition.notify_all()
+
+    def read(self) -> tuple[int, Frame]:
+        """Copy the latest frame out (with its sequence number)"""
+
+        with self.condition:
+            seq = int(self._seq[0])
+            index = int(self._index[0])
+            timestamp = float(self._timestamp[0])
+            beat = bool(self._beat[0])
+            bpm = float(self._bpm[0])
+            data = self._data.copy()
+            mirrored = self._mirrored.copy()
+
+        data.flags.writeable = False
+        mirrored.flags.writeable = False
+        return seq, Frame(index, timestamp, data, mirrored, beat, bpm)
+
+    def close(self) -> None:
+        # The views must go before the buffer can be released
+        del self._seq, self._index, self._timestamp, self._beat, self._bpm
+        del self._data, self._mirrored
+        self._shm.close()
+
+        if self._owner:
+            self._shm.unlink()
+
+
+class FrameReader:
+    """Read-only stand-in for the analyzer, for services in other processes
+
+    Provides what the services use: `frame` and `wait_frame`.
+    """
+
+    def __init__(
+        self, name: str, size: int, condition: ConditionType, channels: int = 1
+    ) -> None:
+        self.size = size
+        self.channels = channels
+
+        self._frames = SharedFrames(size, name, channels, condition)
+        self._last: tuple[int, Frame] = (0, Frame.empty(size, channels))
+
+    @property
+    def frame(self) -> Frame:
+        seq, frame = self._last
+
+        if self._frames.sequence != seq:
+            self._last = seq, frame = self._frames.read()
+
+        return frame
+
+    def wait_frame(self, last: int, timeout: float | None = None) -> Frame:
+        """Wait until a frame newer than index `last` is published"""
+
+        deadline = None if timeout is None else monotonic() + timeout
+        condition = self._frames.condition
+
+        with condition:
+            while (frame := self.frame).index == last:
+                remaining = None if deadline is None else deadline - monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                condition.wait(remaining)
+
+        return frame
+
+    def close(self) -> None:
+        self._frames.close()
+
+
+def _run_service(
+    name: str,
+    size: int,
+    channels: int,
+    condition: ConditionType,
+    factory: Callable[[Analyzer], VAudioService],
+    stop: Event,
+    *,
+    metrics: bool,
+    log_level: int,
+) -> None:
+    # A spawned process starts with the defaults
+    METRICS.enabled = metrics
+
+    root = logging.getLogger()
+    if not root.handlers:
+        logging.basicConfig()
+    root.setLevel(log_level)
+
+    reader = FrameReader(name, size, condition, channels)
+    service = factory(cast("Analyzer", reader))
+
+    thread = Thread(target=service.run, daemon=True)
+    thread.start()
+
+    while thread.is_alive() and not stop.wait(0.2):
+        pass
+
+    service.stop()
+    thread.join(timeout=5)
+    reader.close()
+
+
+def start_service(
+    frames: SharedFrames,
+    factory: Callable[[Analyzer], VAudioService],
+    stop: Event,
+) -> Process:
+    """Run `factory(reader).run()` in a new process, until `stop` is set
+
+    `factory` is called in the new process (so sockets and ports are
+    opened there), it must be picklable, e.g. a `functools.partial`.
+    Metrics and the log level are set up as in this process.
+    """
+
+    process = Process(
+        target=_run_service,
+        args=(
+            frames.name,
+            frames.size,
+            frames.channels,
+            frames.condition,
+            factory,
+            stop,
+        ),
+        kwargs={"metrics": METRICS.enabled, "log_level": logging.getLogger().level},
+        daemon=True,
+    )
+    process.start()
+    return process
@@ -0,0 +1,224 @@
+"""Pre-rendered shows: analyze a track once, play it back anywhere
+
+A show file is a 32 byte header followed by a (frames x width) uint8
+matrix of mirrored frames, quantized the way binary serial frames are
+(`protocol.to_uint8`). Playback memory-maps the matrix, so it starts
+instantly and uses the same memory for any length of track.
+"""
+
+from __future__ import annotations
+
+__all__ = ["Show", "ShowClock", "ShowError", "ShowPlayer", "render", "write_show"]
+
+import struct
+from pathlib import Path
+from time import monotonic
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+import numpy as np
+
+from .analyzer import Analyzer, AnalyzerFFT
+from .batch import analyze_source
+from .protocol import to_uint8
+from .scheduler import FrameScheduler
+from .source import ArraySource, AudioSource
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from .typing import FloatArray, SampleArray
+
+MAGIC = b"VSHW"
+VERSION = 1
+
+# Magic, version, frame width, number of frames, frames per second
+_HEADER = struct.Struct("<4sHHId12x")
+
+
+class ShowError(ValueError):
+    """Not a (supported) show file"""
+
+
+def write_show(path: str | Path, frames: Iterable[FloatArray], fps: float) -> int:
+    """Write mirrored frames to a show file
+
+    Frames are written as they come, so they don't have to fit in
+    memory. Returns the number of frames.
+    """
+
+    n_frames = 0
+    width = 0
+
+    with Path(path).open("wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, 0, fps))
+
+        for frame in frames:
+            values = to_uint8(frame)
+
+            if n_frames == 0:
+                width = values.size
+            elif values.size != width:
+                msg = f"Frame {n_frames} has {values.size} values, expected {width}"
+                raise ShowError(msg)
+
+            f.write(values.tobytes())
+            n_frames += 1
+
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, width, n_frames, fps))
+
+    return n_frames
+
+
+def _replay_frames(analyzer: Analyzer) -> Iterator[FloatArray]:
+    source = analyzer.audio
+
+    while True:
+        analyzer.update()
+
+        if source.finished:
+            return
+
+        yield analyzer.publish().mirrored
+
+
+def render(analyzer: Analyzer, path: str | Path) -> int:
+    """Analyze the whole (file) source of `analyzer` into a show file
+
+    `AnalyzerFFT` of a mono source uses the batch analysis, other
+    analyzers are replayed frame by frame. Returns the number of frames.
+    """
+
+    source = analyzer.audio
+
+    if not isinstance(source, ArraySource):
+        msg = "Only file and array sources can be rendered"
+        raise TypeError(msg)
+
+    fps = source.rate / source.hop
+    frames: Iterable[FloatArray]
+
+    if type(analyzer) is AnalyzerFFT and analyzer.channels == 1:
+        frames = analyze_source(
+            source, analyzer.size, analyzer.normalizer, analyzer.smoothing
+        ).mirrored
+    else:
+        frames = _replay_frames(analyzer)
+
+    return write_show(path, frames, fps)
+
+
+class Show:
+    """Memory-mapped show file"""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+        with self.path.open("rb") as f:
+            header = f.read(_HEADER.size)
+
+        if len(header) < _HEADER.size:
+            msg = f"{self.path}: file too short"
+            raise ShowError(msg)
+
+        magic, version, width, n_frames, fps = _HEADER.unpack(header)
+
+        if magic != MAGIC:
+            msg = f"{self.path}: not a show file"
+            raise ShowError(msg)
+
+        if version != VERSION:
+            msg = f"{self.path}: unsupported show version {version}"
+            raise ShowError(msg)
+
+        self.width: int = width
+        self.fps: float = fps
+
+        self.frames: npt.NDArray[np.uint8]
+
+        if n_frames and width:
+            self.frames = np.memmap(
+                self.path,
+                np.uint8,
+                "r",
+                offset=_HEADER.size,
+                shape=(n_frames, width),
+            )
+        else:  # Nothing to map
+            self.frames = np.zeros((n_frames, width), np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @property
+    def duration(self) -> float:
+        """Length in seconds"""
+
+        return len(self) / self.fps
+
+
+class ShowClock(AudioSource):
+    """Timeline of a show: no samples, only the current frame position
+
+    The position follows the monotonic clock from the first `read`,
+    frames the caller was too late for are skipped.
+    """
+
+    def __init__(self, show: Show) -> None:
+        super().__init__()
+
+        self.show = show
+        self.position: int = 0
+
+        self._scheduler = FrameScheduler(1 / show.fps)
+        self._start: float | None = None
+
+    def read(self) -> SampleArray | None:
+        self._scheduler.wait()
+
+        now = monotonic()
+
+        if self._start is None:
+            self._start = now
+
+        # Rounded: ticks are exact multiples of the frame time
+        self.position = round((now - self._start) * self.show.fps)
+
+        if self.position >= len(self.show):
+            self.finished = True
+
+        return None
+
+
+class ShowPlayer(Analyzer):
+    """Publish the frames of a show in real time
+
+    Drop-in replacement of an analyzer for the output services.
+    """
+
+    def __init__(self, show: Show) -> None:
+        if not len(show):
+            msg = f"{show.path}: show has no frames"
+            raise ShowError(msg)
+
+        self.clock = ShowClock(show)
+        super().__init__(show.width // 2, self.clock)
+
+        self.show = show
+
+    def update(self) -> None:
+        self.clock.update()
+
+    def analyze(self) -> None:
+        pass
+
+    def _row(self) -> FloatArray:
+        index = min(self.clock.position, len(self.show) - 1)
+        return self.show.frames[index].astype(float)
+
+    def get_data(self) -> FloatArray:
+        row = self._row()
+        return row[len(row) // 2 :]
+
+    def mirror(self, _data: FloatArray) -> FloatArray:
+        return self._row()
@@ -0,0 +1,202 @@
+"""Smoothing and fading of band values (lists and NumPy arrays)"""
+
+from __future__ import annotations
+
+__all__ = [
+    "bounds",
+    "fade",
+    "fade_np",
+    "smooth",
+    "smooth_hor",
+    "smooth_hor_np",
+    "smooth_ver",
+    "smooth_ver_directional",
+    "smooth_ver_directional_np",
+]
+
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .typing import FloatArray, IntArray
+
+
+def smooth_ver(
+    old: Iterable[int | float], new: Iterable[int | float], k: float
+) -> list[int | float]:
+    """Make numbers go up and down smoothly
+
+    k: koefficient of smoothing
+    """
+
+    k = 1 / k
+    return [y + (x - y) * k for x, y in zip(new, old)]
+
+
+def smooth_ver_directional(
+    old: Iterable[int | float], new: Iterable[int | float], k_up: float, k_down: float
+) -> list[int | float]:
+    """Make numbers go up and down smoothly
+
+    k: koefficient of smoothing (0-1)
+    """
+
+    return [y + (x - y) * (k_up if (x > y) else k_down) for x, y in zip(new, old)]
+
+
+def smooth_ver_directional_np(
+    old: FloatArray,
+    new: FloatArray,
+    k_up: float,
+    k_down: float,
+    out: FloatArray | None = None,
+) -> FloatArray:
+    """Make numbers go up and down smoothly (same as `smooth_ver_directional`)
+
+    k: koefficient of smoothing (0-1)
+    out: Array to store the result in (may be `old` or `new`)
+    """
+
+    k = np.where(new > old, k_up, k_down)
+    k *= new - old
+    return np.add(old, k, out=out)
+
+
+def smooth_hor(list_: Sequence[int | float], k: int) -> list[int | float]:
+    """Moving average
+
+    k: the size of the half-window (in one side)
+    """
+    return [
+        sum(list_[h] for h in range(max(i - k, 0), min(i + k, len(list_))))
+        // ((k + 1) * 2 - list_[max(i - k, 0) : min(i + k, len(list_))].count(0))
+        for i in range(len(list_))
+    ]
+
+
+@lru_cache(maxsize=16)
+def _window_bounds(n: int, k: int) -> tuple[IntArray, IntArray]:
+    """Bounds of the `smooth_hor` window for every index"""
+
+    i = np.arange(n)
+    return np.maximum(i - k, 0), np.minimum(i + k, n)
+
+
+def smooth_hor_np(arr: FloatArray, k: int, out: FloatArray | None = None) -> FloatArray:
+    """Moving average (same as `smooth_hor`), using cumulative sums
+
+    k: the size of the half-window (in one side)
+    out: Array to store the result in (may be `arr`)
+
+    A 2D `arr` is smoothed row by row.
+    """
+
+    n = arr.shape[-1]
+    lo, hi = _window_bounds(n, k)
+
+    sums: FloatArray = np.zeros((*arr.shape[:-1], n + 1), float)
+    np.cumsum(arr, axis=-1, out=sums[..., 1:])
+
+    zeros: IntArray = np.zeros(sums.shape, np.int64)
+    np.cumsum(arr == 0, axis=-1, out=zeros[..., 1:])
+
+    divisor = (k + 1) * 2 - (zeros[..., hi] - zeros[..., lo])
+    return np.floor_divide(sums[..., hi] - sums[..., lo], divisor, out=out)
+
+
+def smooth_hor_fix(list_: Sequence[int | float], k: int) -> list[int | float]:
+    """Moving average
+
+    k: the size of the half-window (in one side)
+    """
+    return [
+        sum(list_[max(i - k, 0) : min(i + k, len(list_))]) // (k * 2 + 1)
+        for i in range(len(list_))
+    ]
+
+
+def fade(list_: list[int | float]) -> list[int | float]:
+    """Make numbers smaller with index
+
+    [10, 10, 10] -> [9, 8, 7]
+    """
+
+    return [max(list_[i] - i, 0) for i in range(len(list_))]
+
+
+@lru_cache(maxsize=16)
+def _fade_mask(n: int, amount: float) -> FloatArray:
+    # Creates something similar to [1, 2, 3] if amount == 1
+    # and [2, 4, 6] if amount == 2, etc.
+    mask: FloatArray = np.arange(n) * amount
+    mask.flags.writeable = False
+    return mask
+
+
+def fade_np(
+    arr: FloatArray, amount: float = 1, out: FloatArray | None = None
+) -> FloatArray:
+    """Make numbers smaller with index
+
+    arr: Array of numbers
+    amount: Amount of fading (default = 1)
+    out: Array to store the result in (may be `arr`)
+
+    A 2D `arr` is faded row by row.
+
+    Examples:
+        [10, 10, 10] -> [9, 8, 7]
+
+    """
+
+    # Subtract and constrain at 0
+    a: FloatArray = np.subtract(arr, _fade_mask(arr.shape[-1], amount), out=out)
+    np.maximum(a, 0, out=a)
+
+    return a
+
+
+def bounds(list_: list[int | float]) -> list[int | float]:
+    """Constrain values in list between 0 and 255"""
+    return [min(max(i, 0), 255) for i in list_]
+
+
+def smooth(
+    y: FloatArray, box_pts: int, amt: float = 1.0, out: FloatArray | None = None
+) -> FloatArray:
+    """Smooth a numpy array with a box filter
+
+    Same as `np.convolve(y, box, mode="same")`, but summing shifted
+    slices into `out` (must not be `y`) instead of allocating.
+    A 2D `y` is smoothed row by row.
+    """
+
+    if out is None:
+        out = np.zeros_like(y)
+    else:
+        out.fill(0)
+
+    n = y.shape[-1]
+    offset = (box_pts - 1) // 2
+
+    for t in range(box_pts):
+        shift = offset - t
+
+        if abs(shift) >= n:
+            continue
+
+        if shift >= 0:
+            out[..., : n - shift] += y[..., shift:]
+        else:
+            out[..., -shift:] += y[..., : n + shift]
+
+    out *= amt / box_pts
+    return out
+
+
+# def smooth_h(y: FloatArray, box_pts: int, amt: float = 1.0) -> FloatArray:
+#     res: FloatArray = np.ndarray(y.shape)
+
+#     for i in range(y.size):
@@ -0,0 +1,356 @@
+"""Audio sources: where the analyzed samples come from
+
+`AudioSource` does the spectrum analysis, subclasses only provide
+samples. `av_audio.Audio` is the live (PyAudio) source; files and
+arrays can be replayed in real time or as fast as possible.
+"""
+
+from __future__ import annotations
+
+__all__ = [
+    "ArraySource",
+    "AudioSource",
+    "RawSource",
+    "ReplayStats",
+    "WavSource",
+    "replay",
+    "to_int16_range",
+]
+
+import wave
+from abc import abstractmethod
+from dataclasses import dataclass
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .metrics import METRICS
+from .scheduler import FrameScheduler
+from .spectrum import Spectrum, rfft_magnitude
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import numpy.typing as npt
+
+    from .analyzer import Analyzer
+    from .spectrum import BandScale
+    from .typing import FloatArray, SampleArray
+
+
+def to_int16_range(samples: SampleArray) -> SampleArray:
+    """Scale integer or float samples to the int16 range"""
+
+    match samples.dtype:
+        case np.int16:
+            return samples
+        case np.uint8:
+            return (samples.astype(float) - 128) * 256
+        case np.int32:
+            return samples * 2.0**-16
+        case np.float32 | np.float64:
+            return samples * 2.0**15
+        case _:
+            msg = f"Unsupported sample type: {samples.dtype}"
+            raise ValueError(msg)
+
+
+class AudioSource:
+    """Base class for audio sources
+
+    Subclasses implement `read`, which returns the next `chunk` samples
+    (in the int16 range): mono (chunk,) or, for sources of several
+    `channels`, (chunk, channels). All channels are transformed at once,
+    spectra and band values are then (channels, n).
+    """
+
+    def __init__(self, chunk: int = 1024, rate: int = 44100, channels: int = 1) -> None:
+        self._chunk = chunk
+        self._rate = rate
+        self._k = 1000  # Koefficient for multiplying
+
+        self.channels = channels
+        self.scale: BandScale = "log"
+        self.finished: bool = False  # Source has no more samples
+
+        self._fft_size = chunk
+        self._fft: FloatArray = np.zeros(self._spectrum_shape(chunk), float)
+        self._spectra: dict[int, Spectrum] = {}
+
+    def _spectrum_shape(self, fft_size: int) -> tuple[int, ...]:
+        n_bins = fft_size // 2 + 1
+        return (n_bins,) if self.channels == 1 else (self.channels, n_bins)
+
+    @property
+    def chunk(self) -> int:
+        return self._chunk
+
+    @property
+    def rate(self) -> int:
+        return self._rate
+
+    @property
+    def frame_rate(self) -> float:
+        """Number of chunks analyzed per second of audio"""
+
+        return self._rate / self._chunk
+
+    @property
+    def blocking(self) -> bool:
+        """`read` waits for the samples in real time
+
+        The caller has to keep up with `frame_rate` and shouldn't pace
+        itself slower.
+        """
+
+        return False
+
+    @property
+    def live(self) -> bool:
+        """Samples arrive in real time and reads return the latest ones
+
+        Read less often than `frame_rate`, a live source skips hops.
+        """
+
+        return False
+
+    @property
+    def magnitudes(self) -> FloatArray:
+        """Magnitude spectrum of the latest chunk, (bins,) or (channels, bins)"""
+
+        return self._fft
+
+    @property
+    def fft_size(self) -> int:
+        """Number of latest samples of every chunk analyzed (default: all)"""
+
+        return self._fft_size
+
+    @fft_size.setter
+    def fft_size(self, n: int) -> None:
+        if not 0 < n <= self._chunk:
+            msg = f"FFT size must be between 1 and the chunk size ({self._chunk})"
+            raise ValueError(msg)
+
+        if n != self._fft_size:
+            self._fft_size = n
+            self._fft = np.zeros(self._spectrum_shape(n), float)
+
+    @abstractmethod
+    def read(self) -> SampleArray | None:
+        """Read the next `chunk` samples (None if there are none yet/left)"""
+
+    def setup(self) -> None:
+        """Open the source"""
+
+    def get_spectrum(self, n: int) -> Spectrum:
+        """Get (cached) spectrum engine producing `n` bands"""
+
+        spectrum = self._spectra.get(n)
+
+        if (
+            spectrum is None
+            or spectrum.scale != self.scale
+            or spectrum.chunk != self._fft_size
+        ):
+            spectrum = Spectrum(self._fft_size, self._rate, n, self.scale)
+            self._spectra[n] = spectrum
+
+        return spectrum
+
+    def update(self) -> None:
+        with METRICS.time("capture"):
+            samples = self.read()
+
+        if samples is None:
+            return
+
+        # Calculate FFT
+        if len(samples) > self._fft_size:
+            samples = samples[-self._fft_size :]
+
+        if samples.ndim == 2:
+            samples = samples.T  # One channel per row
+
+        with METRICS.time("fft"):
+            self._fft = rfft_magnitude(samples) / 11000
+
+    def loop(self) -> None:
+        while not self.finished:
+            self.update()
+
+    def get_values(self, n: int = 100) -> list[int | float]:
+        return self.get_values_np(n).tolist()
+
+    def get_values_np(self, n: int = 100, out: FloatArray | None = None) -> FloatArray:
+        """Get spectrum binned into `n` bands
+
+        out: Array to store the values in (a new one if None)
+        """
+
+        values: FloatArray = self.get_spectrum(n).bands(self._fft)
+
+        return np.multiply(values, self._k, out=out)
+
+
+class ArraySource(AudioSource):
+    """Replay samples from an array
+
+    Args:
+        samples: Samples, shaped (n,) or (n, channels)
+        rate: Sample rate
+        chunk: FFT size
+        hop: Samples between frames (default = chunk)
+        paced: Return frames in real time (`hop / rate` apart)
+            instead of as fast as possible
+        loop: Start over at the end instead of finishing
+        downmix: Average the channels of (n, channels) samples
+            (otherwise each channel is analyzed separately)
+
+    """
+
+    def __init__(
+        self,
+        samples: SampleArray,
+        rate: int = 44100,
+        chunk: int = 1024,
+        hop: int | None = None,
+        *,
+        paced: bool = False,
+        loop: bool = False,
+        downmix: bool = True,
+    ) -> None:
+        channels = 1 if downmix or samples.ndim == 1 else samples.shape[1]
+        super().__init__(chunk, rate, channels)
+
+        self.samples = samples
+        self.hop = hop or chunk
+        self.position: int = 0
+        self.looping = loop
+
+        self._scheduler = FrameScheduler(self.hop / rate) if paced else None
+
+    @property
+    def frame_rate(self) -> float:
+        return self._rate / self.hop
+
+    @property
+    def blocking(self) -> bool:
+        return self._scheduler is not None
+
+    def __len__(self) -> int:
+        """Number of frames"""
+
+        return max((len(self.samples) - self._chunk) // self.hop + 1, 0)
+
+    def read(self) -> SampleArray | None:
+        end = self.position + self._chunk
+
+        if end > len(self.samples) and self.looping and len(self):
+            self.position = 0
+            end = self._chunk
+
+        if end > len(self.samples):
+            self.finished = True
+            return None
+
+        if self._scheduler is not None:
+            self._scheduler.wait()
+
+        samples = to_int16_range(self.samples[self.position : end])
+        self.position += self.hop
+
+        if samples.ndim == 2 and self.channels == 1:
+            samples = samples.mean(axis=1)
+
+        return samples
+
+
+class WavSource(ArraySource):
+    """Replay a WAV file (8, 16 or 32 bit PCM)"""
+
+    def __init__(
+        self,
+        path: str | Path,
+        chunk: int = 1024,
+        hop: int | None = None,
+        *,
+        paced: bool = False,
+        downmix: bool = True,
+    ) -> None:
+        with wave.open(str(path), "rb") as f:
+            rate = f.getframerate()
+            channels = f.getnchannels()
+            width = f.getsampwidth()
+            data = f.readframes(f.getnframes())
+
+        # WAV samples are little-endian, 8 bit ones are unsigned
+        dtypes = {1: np.dtype(np.uint8), 2: np.dtype("<i2"), 4: np.dtype("<i4")}
+
+        if width not in dtypes:
+            msg = f"Unsupported WAV sample width: {width * 8} bit"
+            raise ValueError(msg)
+
+        dtype = dtypes[width]
+        samples = np.frombuffer(data, dtype).astype(dtype.newbyteorder("="), copy=False)
+        samples = samples.reshape(-1, channels)
+
+        super().__init__(samples, rate, chunk, hop, paced=paced, downmix=downmix)
+
+
+class RawSource(ArraySource):
+    """Replay a headerless PCM file (memory-mapped)"""
+
+    def __init__(
+        self,
+        path: str | Path,
+        rate: int = 44100,
+        dtype: npt.DTypeLike = np.int16,
+        channels: int = 1,
+        chunk: int = 1024,
+        hop: int | None = None,
+        *,
+        paced: bool = False,
+        downmix: bool = True,
+    ) -> None:
+        samples = np.memmap(path, dtype=dtype, mode="r")
+        samples = samples[: len(samples) // channels * channels]
+
+        if channels > 1:
+            samples = samples.reshape(-1, channels)
+
+        super().__init__(samples, rate, chunk, hop, paced=paced, downmix=downmix)
+
+
+@dataclass
+class ReplayStats:
+    frames: int
+    seconds: float
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.seconds if self.seconds else 0.0
+
+
+def replay(analyzer: Analyzer, max_frames: int | None = None) -> ReplayStats:
+    """Feed the analyzer until its source is exhausted, measuring speed
+
+    With an unpaced source this runs as fast as possible, which makes
+    it a benchmark of the analysis (no sound hardware needed).
+    """
+
+    source = analyzer.audio
+    frames = 0
+    start = perf_counter()
+
+    while not source.finished and (max_frames is None or frames < max_frames):
+        analyzer.update()
+
+        if source.finished:
+            break
+
+        analyzer.publish()
+        frames += 1
+
+    return ReplayStats(frames, perf_counter() - start)
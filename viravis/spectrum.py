@@ -0,0 +1,143 @@
+"""Real FFT spectrum with perceptual band binning"""
+
+from __future__ import annotations
+
+__all__ = [
+    "BandScale",
+    "Spectrum",
+    "band_edges",
+    "get_window",
+    "rfft_magnitude",
+]
+
+from functools import lru_cache
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .typing import FloatArray, IntArray
+
+BandScale = Literal["log", "mel", "linear"]
+
+
+@lru_cache(maxsize=16)
+def get_window(n: int) -> FloatArray:
+    """Get a (cached, read-only) Hann window of length `n`"""
+
+    window: FloatArray = np.hanning(n)
+    window.flags.writeable = False
+    return window
+
+
+def rfft_magnitude(samples: FloatArray) -> FloatArray:
+    """Magnitude of the Hann-windowed rfft, normalized by the window gain"""
+
+    window = get_window(samples.shape[-1])
+    fft = np.fft.rfft(samples * window)
+    return np.abs(fft) * (2 / window.sum())
+
+
+def _hz_to_mel(f: FloatArray) -> FloatArray:
+    return 2595 * np.log10(1 + f / 700)
+
+
+def _mel_to_hz(m: FloatArray) -> FloatArray:
+    return 700 * (10 ** (m / 2595) - 1)
+
+
+def band_edges(
+    n_bins: int,
+    size: int,
+    rate: int,
+    scale: BandScale = "log",
+    fmin: float = 20.0,
+    fmax: float | None = None,
+) -> IntArray:
+    """Split `n_bins` rfft bins into `size` bands
+
+    Returns the index of the first bin of every band. Indices are
+    non-decreasing; a band whose start equals the next one's start
+    consists of a single bin (the way `np.add.reduceat` treats it).
+
+    Args:
+        n_bins: Number of rfft bins (`chunk // 2 + 1`)
+        size: Number of bands
+        rate: Sample rate
+        scale: Spacing of the bands: "log", "mel" or "linear"
+        fmin: Lowest frequency of the first band
+        fmax: Highest frequency of the last band (default = Nyquist)
+
+    """
+
+    nyquist = rate / 2
+    fmax = nyquist if fmax is None else min(fmax, nyquist)
+    fmin = max(fmin, 0.0)
+
+    bounds = np.array((fmin, fmax), float)
+
+    match scale:
+        case "log":
+            bounds = np.log10(np.maximum(bounds, 1.0))
+            freqs = 10 ** np.linspace(bounds[0], bounds[1], size, endpoint=False)
+        case "mel":
+            bounds = _hz_to_mel(bounds)
+            freqs = _mel_to_hz(np.linspace(bounds[0], bounds[1], size, endpoint=False))
+        case "linear":
+            freqs = np.linspace(bounds[0], bounds[1], size, endpoint=False)
+
+    # Frequency -> bin index (bin `i` is centered at `i * rate / chunk`)
+    hz_per_bin = nyquist / (n_bins - 1)
+    edges: IntArray = np.floor(freqs / hz_per_bin).astype(np.int64)
+
+    # Skip the DC bin and spread the bands over distinct bins
+    # where there are enough of them
+    edges = np.maximum(edges, np.arange(1, size + 1))
+    return np.minimum(edges, n_bins - 1)
+
+
+class Spectrum:
+    """Magnitude spectrum binned into `size` bands
+
+    Band edges and widths are computed once, so binning a frame
+    is a single `np.add.reduceat`.
+    """
+
+    def __init__(
+        self,
+        chunk: int,
+        rate: int,
+        size: int,
+        scale: BandScale = "log",
+        fmin: float = 20.0,
+        fmax: float | None = None,
+    ) -> None:
+        self.chunk = chunk
+        self.rate = rate
+        self.size = size
+        self.scale: BandScale = scale
+
+        self.n_bins = chunk // 2 + 1
+        self.edges = band_edges(self.n_bins, size, rate, scale, fmin, fmax)
+
+        # Number of bins in each band (at least one, see `band_edges`)
+        widths = np.diff(self.edges, append=self.n_bins)
+        self.widths: FloatArray = np.maximum(widths, 1).astype(float)
+
+        self._bands: FloatArray = np.zeros(size, float)
+
+    def bands(self, magnitude: FloatArray, out: FloatArray | None = None) -> FloatArray:
+        """Average the magnitude spectrum over every band
+
+        A 2D `magnitude` holds one spectrum per row.
+        """
+
+        if out is None:
+            if magnitude.ndim == 1:
+                out = self._bands
+            else:
+                out = np.empty((*magnitude.shape[:-1], self.size), float)
+
+        np.add.reduceat(magnitude, self.edges, axis=-1, out=out)
+        np.divide(out, self.widths, out=out)
+        return out
@@ -0,0 +1,176 @@
+"""Streaming HTTP output: frames are pushed to connected clients
+
+Routes:
+    /events - Server-Sent Events, one `{"index": ..., "data": [...]}` per frame
+        (with `"beat"` and `"bpm"` too if beats are detected)
+    /stream - Binary frames (see `protocol.encode_binary`) back to back
+"""
+
+from __future__ import annotations
+
+__all__ = ["ClientStats", "VAudioStreamServer"]
+
+import json
+import logging
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from typing import TYPE_CHECKING, Callable, ClassVar
+
+import numpy as np
+
+from .metrics import METRICS
+from .protocol import encode_binary
+from .service import VAudioService
+
+if TYPE_CHECKING:
+    from .analyzer import Analyzer
+    from .frame import Frame
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ClientStats:
+    address: str
+    route: str
+    sent: int = 0
+    dropped: int = 0  # Frames skipped because the client was too slow
+
+
+def _encode_event(frame: Frame) -> bytes:
+    event: dict[str, object] = {
+        "index": frame.index,
+        "data": np.nan_to_num(frame.mirrored).tolist(),
+    }
+
+    if frame.bpm or frame.beat:
+        event["beat"] = frame.beat
+        event["bpm"] = round(frame.bpm, 1)
+
+    body = json.dumps(event, separators=(",", ":"))
+    return f"id: {frame.index}\ndata: {body}\n\n".encode()
+
+
+def _encode_binary(frame: Frame) -> bytes:
+    return encode_binary(frame.mirrored)
+
+
+class _EncodedCache:
+    """Encode each frame once, however many clients receive it"""
+
+    def __init__(self, encode: Callable[[Frame], bytes]) -> None:
+        self._encode = encode
+        self._last: tuple[int, bytes] = (-1, b"")
+
+    def get(self, frame: Frame) -> bytes:
+        index, payload = self._last
+
+        if index != frame.index:
+            with METRICS.time("stream_encode"):
+                payload = self._encode(frame)
+            self._last = (frame.index, payload)
+
+        return payload
+
+
+class VAudioStreamServer(VAudioService):
+    """Push every new frame to connected clients
+
+    Every client is served by its own thread, which always sends the
+    latest frame: a slow client skips the frames published while it was
+    still receiving (they are counted in `ClientStats.dropped`) instead
+    of queueing them up or slowing down other clients.
+    """
+
+    ROUTES: ClassVar[dict[str, tuple[str, Callable[[Frame], bytes]]]] = {
+        "/events": ("text/event-stream", _encode_event),
+        "/stream": ("application/octet-stream", _encode_binary),
+    }
+
+    def __init__(
+        self,
+        analyzer: Analyzer,
+        port: int = 7778,
+        host: str = "0.0.0.0",  # noqa: S104
+        send_timeout: float = 5.0,
+    ) -> None:
+        super().__init__(analyzer)
+
+        self.clients: dict[int, ClientStats] = {}
+        self._clients_lock = Lock()
+        self._caches = {
+            route: _EncodedCache(encode) for route, (_, encode) in self.ROUTES.items()
+        }
+
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            timeout = send_timeout  # Drop clients that stop reading
+
+            def do_GET(self) -> None:
+                service.serve_client(self)
+
+            def log_message(self, *_: object) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def run(self) -> None:
+        super().run()
+        self._server.serve_forever(poll_interval=0.1)
+
+    def stop(self) -> None:
+        super().stop()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_client(self, handler: BaseHTTPRequestHandler) -> None:
+        route = handler.path.split("?", 1)[0]
+
+        if route not in self.ROUTES:
+            handler.send_error(404)
+            return
+
+        content_type, _ = self.ROUTES[route]
+        cache = self._caches[route]
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Cache-Control", "no-cache")
+        handler.send_header("Access-Control-Allow-Origin", "*")
+        handler.end_headers()
+
+        stats = ClientStats(f"{handler.client_address[0]}", route)
+        key = id(handler)
+
+        with self._clients_lock:
+            self.clients[key] = stats
+
+        last = self.analyzer.frame.index
+
+        try:
+            while self.running:
+                frame = self.analyzer.wait_frame(last, timeout=0.5)
+
+                if frame.index == last:
+                    continue
+
+                stats.dropped += max(frame.index - last - 1, 0)
+                last = frame.index
+
+                handler.wfile.write(cache.get(frame))
+                handler.wfile.flush()
+                stats.sent += 1
+
+        except OSError:
+            logger.info("Stream client %s disconnected", stats.address)
+
+        finally:
+            with self._clients_lock:
+                del self.clients[key]
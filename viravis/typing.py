@@ -5,3 +5,4 @@ import numpy.typing as npt
 
 FloatArray: t.TypeAlias = npt.NDArray[np.float64]
 IntArray: t.TypeAlias = npt.NDArray[np.int64]
+SampleArray: t.TypeAlias = npt.NDArray[np.number[t.Any]]
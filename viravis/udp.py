@@ -0,0 +1,211 @@
+"""UDP output: raw binary frames or E1.31 (sACN) universes"""
+
+from __future__ import annotations
+
+__all__ = [
+    "E131_PORT",
+    "E131Packet",
+    "VAudioUdp",
+    "e131_multicast_address",
+]
+
+import logging
+import socket
+import struct
+import uuid
+from typing import TYPE_CHECKING, Iterable, Literal
+
+import numpy as np
+
+from .metrics import METRICS
+from .protocol import encode_binary, to_uint8
+from .service import Sync, VAudioService
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from .analyzer import Analyzer
+    from .frame import Frame
+
+logger = logging.getLogger(__name__)
+
+UdpProtocol = Literal["raw", "e131"]
+
+E131_PORT = 5568
+E131_HEADER_SIZE = 126
+E131_MAX_SLOTS = 512
+
+_ACN_PACKET_ID = b"ASC-E1.17\x00\x00\x00"
+_VECTOR_ROOT_E131_DATA = 0x00000004
+_VECTOR_E131_DATA_PACKET = 0x00000002
+_VECTOR_DMP_SET_PROPERTY = 0x02
+
+
+def e131_multicast_address(universe: int) -> str:
+    """Multicast group of an E1.31 universe"""
+
+    return f"239.255.{universe >> 8}.{universe & 0xFF}"
+
+
+def _flags_length(length: int) -> int:
+    return 0x7000 | length
+
+
+class E131Packet:
+    """Preallocated E1.31 data packet of one universe
+
+    The header is built once, a frame only updates the sequence number,
+    the slot count and the slot values (written in place through a
+    NumPy view of the packet buffer).
+    """
+
+    def __init__(
+        self,
+        universe: int,
+        cid: bytes,
+        source_name: str = "viravis",
+        priority: int = 100,
+    ) -> None:
+        self.universe = universe
+        self.buffer = bytearray(E131_HEADER_SIZE + E131_MAX_SLOTS)
+        self.slots: npt.NDArray[np.uint8] = np.frombuffer(
+            self.buffer, np.uint8, E131_MAX_SLOTS, E131_HEADER_SIZE
+        )
+        self.size = 0
+
+        # Root layer
+        struct.pack_into("!HH12s", self.buffer, 0, 0x0010, 0x0000, _ACN_PACKET_ID)
+        struct.pack_into("!I16s", self.buffer, 18, _VECTOR_ROOT_E131_DATA, cid)
+
+        # Framing layer
+        struct.pack_into(
+            "!I64sBHBBH",
+            self.buffer,
+            40,
+            _VECTOR_E131_DATA_PACKET,
+            source_name.encode()[:63],
+            priority,
+            0,  # Synchronization address
+            0,  # Sequence number
+            0,  # Options
+            universe,
+        )
+
+        # DMP layer
+        struct.pack_into(
+            "!BBHHHB", self.buffer, 117, _VECTOR_DMP_SET_PROPERTY, 0xA1, 0, 1, 1, 0
+        )
+
+        self.resize(0)
+
+    def resize(self, size: int) -> None:
+        """Set the number of slots (and all the layer lengths)"""
+
+        self.size = size
+        length = E131_HEADER_SIZE + size
+
+        struct.pack_into("!H", self.buffer, 16, _flags_length(length - 16))
+        struct.pack_into("!H", self.buffer, 38, _flags_length(length - 38))
+        struct.pack_into("!H", self.buffer, 115, _flags_length(length - 115))
+        struct.pack_into("!H", self.buffer, 123, size + 1)  # + start code
+
+    def set_sequence(self, sequence: int) -> None:
+        self.buffer[111] = sequence & 0xFF
+
+    def payload(self) -> memoryview:
+        return memoryview(self.buffer)[: E131_HEADER_SIZE + self.size]
+
+
+class VAudioUdp(VAudioService):
+    """Send frames over UDP to unicast or multicast destinations
+
+    "raw" sends every frame as one datagram in the binary serial format
+    (`protocol.encode_binary`). "e131" splits the frame into E1.31
+    universes of `universe_size` slots, starting at `universe`.
+    Without destinations, E1.31 universes go to their multicast groups.
+    """
+
+    def __init__(
+        self,
+        analyzer: Analyzer,
+        destinations: Iterable[tuple[str, int]] = (),
+        protocol: UdpProtocol = "e131",
+        universe: int = 1,
+        universe_size: int = E131_MAX_SLOTS,
+        sequence: bool = True,  # noqa: FBT001, FBT002
+        sync: Sync = "interval",
+        multicast_ttl: int = 1,
+    ) -> None:
+        super().__init__(analyzer)
+
+        self.destinations = list(destinations)
+        self.protocol: UdpProtocol = protocol
+        self.universe = universe
+        self.universe_size = min(universe_size, E131_MAX_SLOTS)
+        self.sequence_enabled = sequence
+        self.sync = sync
+
+        if protocol == "raw" and not self.destinations:
+            msg = "Raw UDP output needs at least one destination"
+            raise ValueError(msg)
+
+        self.sequence: int = 0
+        self.packets: list[E131Packet] = []
+        self._cid = uuid.uuid4().bytes
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setsockopt(
+            socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, multicast_ttl
+        )
+
+    def run(self) -> None:
+        super().run()
+
+        for frame in self.frames():
+            try:
+                with METRICS.time("udp_send"):
+                    self.send(frame)
+            except OSError:
+                logger.warning("UDP send failed", exc_info=True)
+
+    def stop(self) -> None:
+        super().stop()
+        self._socket.close()
+
+    def send(self, frame: Frame) -> None:
+        if self.protocol == "raw":
+            data = encode_binary(frame.mirrored)
+            for destination in self.destinations:
+                self._socket.sendto(data, destination)
+            return
+
+        self._send_e131(to_uint8(frame.mirrored))
+
+    def _universe_packets(self, n_values: int) -> list[E131Packet]:
+        n_universes = max(-(-n_values // self.universe_size), 1)
+
+        while len(self.packets) < n_universes:
+            universe = self.universe + len(self.packets)
+            self.packets.append(E131Packet(universe, self._cid))
+
+        return self.packets[:n_universes]
+
+    def _send_e131(self, values: npt.NDArray[np.uint8]) -> None:
+        if self.sequence_enabled:
+            self.sequence = (self.sequence + 1) & 0xFF
+
+        for i, packet in enumerate(self._universe_packets(values.size)):
+            chunk = values[i * self.universe_size : (i + 1) * self.universe_size]
+
+            if packet.size != chunk.size:
+                packet.resize(chunk.size)
+
+            packet.slots[: chunk.size] = chunk
+            packet.set_sequence(self.sequence)
+
+            destinations = self.destinations or [
+                (e131_multicast_address(packet.universe), E131_PORT)
+            ]
+
+            for destination in destinations:
+                self._socket.sendto(packet.payload(), destination)
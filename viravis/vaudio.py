@@ -8,40 +8,87 @@ __all__ = ["AudioVisualizer"]
 
 import argparse
 import logging
+import multiprocessing
 import os
 import sys
+from contextlib import nullcontext
+from functools import partial
 from math import floor, isnan
+from pathlib import Path
 from threading import Thread
-from time import sleep, time
-from typing import Iterable, Literal
+from time import sleep
+from typing import TYPE_CHECKING, Callable, Iterable, Literal
 
 import numpy as np
-import saaba
-from serial import SerialException
-
-from .analyzer import (
-    Analyzer,
-    AnalyzerFFT,
-    AnalyzerFlat,
-    AnalyzerRolling,
-    AnalyzerRollingEase,
-)
-from .av_audio import Audio
-from .av_serial import Serial
+
+# PyAudio, pyserial and saaba are imported by the code that needs them,
+# so e.g. an HTTP-only setup doesn't load the serial or audio libraries
+from .beat import BeatDetector
+from .governor import Governor
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .metrics import METRICS
+from .normalize import Normalizer
+from .protocol import DeltaEncoder, encode_binary
+from .registry import ANALYZERS, SERVICES
+from .router import Segment, SerialFormat, load_outputs
+from .service import Sync, VAudioService
+from .shared import SharedFrames, start_service
+from .show import Show, ShowPlayer, render
+from .source import RawSource, WavSource, replay
+from .udp import E131_PORT
+
+if TYPE_CHECKING:
+    import saaba
+
+    from .analyzer import Analyzer
+    from .av_serial import Serial
+    from .frame import Frame
+    from .source import AudioSource
+    from .typing import FloatArray
 
 DIRNAME: str = __file__.replace("\\", "/").rsplit("/", 1)[0]
 
 
 logger = logging.getLogger(__name__)
 
+_http_requests = METRICS.counter("http_requests_total", "HTTP API requests")
+_serial_reconnects = METRICS.counter(
+    "serial_reconnects_total", "Serial port reconnections"
+)
+
 
 class Args(argparse.Namespace):
     list: bool
-    mode: Literal["fft", "rolling", "rollingease", "flat"]
+    mode: str
     port: str
+    outputs: str | None
     no_serial: bool
     device: str | None
+    file: str | None
+    benchmark: bool
+    render: str | None
+    play: str | None
     size: int
+    scale: Literal["log", "mel", "linear"]
+    hop: int | None
+    channels: int
+    stereo: bool
+    beat: bool
+    level_window: int
+    level_statistic: Literal["mean", "max"]
+    level_decay: float | None
+    serial_format: SerialFormat
+    serial_sync: Sync
+    stream_port: int | None
+    udp: list[str] | None
+    service: list[str] | None
+    udp_protocol: Literal["raw", "e131"]
+    universe: int
+    metrics: bool
+    multiprocess: bool
+    governor: bool
+    target_fps: float
+    cpu_budget: float
 
 
 def to_hex(n: float) -> str:
@@ -82,32 +129,41 @@ def _stringify_http(data: Iterable[int | float]) -> list[int | float]:
     return res
 
 
-def get_default_device_pulseaudio() -> str:
-    command = 'pacmd list-sinks | grep -Pzo "\\* index(.*\\n)*" | sed \\$d | grep -e "device.description" | cut -f2 -d\\"'  # noqa: E501
-    out = subprocess.check_output(["/bin/sh", "-c", command])  # noqa: S603
-    return out.decode().rstrip()
+def _parse_address(address: str, default_port: int) -> tuple[str, int]:
+    """'host[:port]' -> (host, port)"""
 
+    host, _, port = address.partition(":")
+    return host, int(port) if port else default_port
 
-class VAudioService:
-    def __init__(self, analyzer: Analyzer) -> None:
-        self.analyzer = analyzer
-        self.running: bool
 
-    def run(self) -> None:
-        self.running = True
+def _mirrored(frame: Frame) -> FloatArray:
+    return frame.mirrored
 
-    def stop(self) -> None:
-        self.running = False
+
+def get_default_device_pulseaudio() -> str:
+    command = 'pacmd list-sinks | grep -Pzo "\\* index(.*\\n)*" | sed \\$d | grep -e "device.description" | cut -f2 -d\\"'  # noqa: E501
+    out = subprocess.check_output(["/bin/sh", "-c", command])  # noqa: S603
+    return out.decode().rstrip()
 
 
 class VAudioHttpServer(VAudioService):
     def __init__(self, analyzer: Analyzer) -> None:
+        import saaba
+
         super().__init__(analyzer)
         self._server = saaba.App()
+        self._server.get("/")(self.serve_data)
+        self._server.get("/metrics")(self.serve_metrics)
 
-        @self._server.get("/")
-        def _(_: saaba.Request, res: saaba.Response) -> None:
-            res.send({"data": _stringify_http(self.analyzer.get_data_mirrored())})
+    def serve_data(self, _: saaba.Request, res: saaba.Response) -> None:
+        _http_requests.inc()
+        res.send({"data": _stringify_http(self.analyzer.frame.mirrored)})
+
+    def serve_metrics(self, _: saaba.Request, res: saaba.Response) -> None:
+        _http_requests.inc()
+        # Not the type `send` picks for a string
+        res.headers["Content-Type"] = METRICS_CONTENT_TYPE
+        res.send(METRICS.render())
 
     def run(self) -> None:
         self._server.listen("0.0.0.0", 7777)  # noqa: S104
@@ -117,35 +173,96 @@ class VAudioHttpServer(VAudioService):
 
 
 class VAudioSerial(VAudioService):
-    def __init__(self, analyzer: Analyzer, port: str) -> None:
+    def __init__(
+        self,
+        analyzer: Analyzer,
+        port: str,
+        serial_format: SerialFormat = "text",
+        sync: Sync = "interval",
+        transform: Callable[[Frame], FloatArray] | None = None,
+        baudrate: int = 115200,
+    ) -> None:
+        """Send analyzer data to a serial port
+
+        Args:
+            analyzer: Analyzer to take data from
+            port: Serial port name (or a pyserial URL, like `loop://`)
+            serial_format: Frame encoding
+            sync: Send every `send_interval` seconds ("interval")
+                or as soon as the analyzer publishes a frame ("frame")
+            transform: Make the data to send from a frame
+                (default: the mirrored frame)
+            baudrate: Serial baudrate
+
+        """
+
         super().__init__(analyzer)
 
         self.port_name = port
-        self.send_interval: float = 0.05
+        self.port: Serial | None = None
+        self.baudrate = baudrate
+        self.sync = sync
+        self.transform = transform or _mirrored
+
+        self.encode: Callable[[Iterable[int | float]], str | bytes]
+        self._delta: DeltaEncoder | None = None
+
+        match serial_format:
+            case "text":
+                self.encode = _stringify_serial
+            case "binary":
+                self.encode = encode_binary
+            case "delta":
+                self._delta = DeltaEncoder()
+                self.encode = self._delta.encode
+            case _:
+                msg = f"Unknown serial format: {serial_format}"
+                raise ValueError(msg)
+
+    def _connect(self) -> Serial | None:
+        from serial import SerialException
+
+        from .av_serial import Serial
+
+        while self.running:
+            try:
+                return Serial(self.port_name, self.baudrate)
+            except SerialException:
+                logger.warning(
+                    "Serial port %s not found. Retry after 1 second", self.port_name
+                )
+                sleep(1)
+
+        return None
 
     def run(self) -> None:
+        from serial import SerialException
+
         super().run()
 
-        port = None
+        self.port = self._connect()
 
-        while port is None:
-            if not self.running:
+        for frame in self.frames():
+            if self.port is None:
                 return
 
             try:
-                port = Serial(self.port_name)
+                with METRICS.time("serial_encode"):
+                    data = self.encode(self.transform(frame))
+
+                with METRICS.time("serial_send"):
+                    self.port.send(data)
             except SerialException:
-                logger.warning(
-                    "Serial port %s not found. Retry after 1 second", self.port_name
-                )
-                sleep(1)
+                logger.warning("Serial port %s disconnected", self.port_name)
+                self.port.close()
 
-        delta: float = 0
-        while self.running:
-            if time() - delta > self.send_interval:
-                delta = time()
-                data = _stringify_serial(self.analyzer.get_data_mirrored())
-                port.send(data)
+                if self._delta is not None:
+                    self._delta.reset()
+
+                self.port = self._connect()
+
+                if self.port is not None:
+                    _serial_reconnects.inc()
 
 
 class AudioVisualizer:
@@ -169,54 +286,120 @@ class AudioVisualizer:
         self.threads: list[Thread] = []
 
         if self._args.list:
+            from .av_serial import Serial
+
             Serial.list()
             sys.exit(0)
 
     def run(self) -> None:
         """Start the visualizer"""
 
-        audio = Audio()
+        METRICS.enabled = self._args.metrics
 
-        if self._args.device is not None:
-            device_name = self._args.device
-        else:
-            match sys.platform:
-                case "win32":
-                    device_name = "Stereo Mix"
-                # case "linux":
-                #     device_name = f"Monitor of {get_default_device_pulseaudio()}"
-                case _:
-                    device_name = "default"
+        analyzer: Analyzer
 
-        logger.info("Chosen device: `%s`", device_name)
+        if self._args.play is not None:
+            analyzer = ShowPlayer(Show(self._args.play))
+            self._run_services(analyzer)
+            return
 
-        # device_name = Audio.select()
+        audio = self._open_audio()
+        audio.scale = self._args.scale
 
-        index = Audio.select_by_name(device_name)
+        normalizer = Normalizer(
+            self._args.level_window,
+            self._args.level_statistic,
+            self._args.level_decay,
+        )
 
-        if index is None:
-            msg = "No audio input device found"
-            raise RuntimeError(msg)
+        beat = BeatDetector(audio.frame_rate) if self._args.beat else None
+
+        analyzer_class = ANALYZERS.load(self._args.mode)
+        analyzer = analyzer_class(self.size, audio, normalizer, beat)
+
+        # Some modes detect beats without --beat
+        if (detector := analyzer.beat) is not None:
+            METRICS.gauge("tempo_bpm", lambda: detector.bpm, "Estimated tempo")
+
+        if self._args.benchmark:
+            stats = replay(analyzer)
+            logger.info(
+                "%d frames in %.2f s: %.1f frames per second",
+                stats.frames,
+                stats.seconds,
+                stats.fps,
+            )
+            return
+
+        if self._args.render is not None:
+            frames = render(analyzer, self._args.render)
+            logger.info("Rendered %d frames to %s", frames, self._args.render)
+            return
+
+        self._run_services(analyzer)
+
+    def _service_factories(self) -> list[Callable[[Analyzer], VAudioService]]:
+        """Services selected by arguments, created when given the analyzer"""
+
+        factories: list[Callable[[Analyzer], VAudioService]] = []
+
+        if self._args.outputs is not None:
+            factories.extend(
+                partial(
+                    SERVICES.load("serial"),
+                    port=spec.port,
+                    serial_format=spec.serial_format,
+                    sync=self._args.serial_sync,
+                    transform=Segment(spec),
+                    baudrate=spec.baudrate,
+                )
+                for spec in load_outputs(self._args.outputs)
+            )
+
+        elif not self._args.no_serial:
+            factories.append(
+                partial(
+                    SERVICES.load("serial"),
+                    port=self._args.port,
+                    serial_format=self._args.serial_format,
+                    sync=self._args.serial_sync,
+                )
+            )
+
+        factories.append(SERVICES.load("http"))
+
+        if self._args.stream_port is not None:
+            factories.append(
+                partial(SERVICES.load("stream"), port=self._args.stream_port)
+            )
+
+        if self._args.udp is not None:
+            factories.append(
+                partial(
+                    SERVICES.load("udp"),
+                    destinations=[
+                        _parse_address(a, E131_PORT) for a in self._args.udp if a
+                    ],
+                    protocol=self._args.udp_protocol,
+                    universe=self._args.universe,
+                )
+            )
 
-        audio.device_index = index
-        audio.setup()
+        # Services of other packages
+        factories.extend(SERVICES.load(name) for name in self._args.service or ())
 
-        analyzer: Analyzer
+        return factories
 
-        match self._args.mode:
-            case "fft":
-                analyzer = AnalyzerFFT(self.size, audio)
-            case "rolling":
-                analyzer = AnalyzerRolling(self.size, audio)
-            case "rollingease":
-                analyzer = AnalyzerRollingEase(self.size, audio)
-            case "flat":
-                analyzer = AnalyzerFlat(self.size, audio)
+    def _run_services(self, analyzer: Analyzer) -> None:
+        """Run the output services until the source finishes or one stops"""
 
-        if not self._args.no_serial:
-            self.services.append(VAudioSerial(analyzer, self._args.port))
+        if self._args.multiprocess:
+            self._run_service_processes(analyzer)
+            return
 
-        self.services.append(VAudioHttpServer(analyzer))
+        audio = analyzer.audio
+
+        self.services = [factory(analyzer) for factory in self._service_factories()]
 
         for s in self.services:
             _t = Thread(target=s.run, daemon=True)
@@ -224,10 +407,16 @@ class AudioVisualizer:
             logger.info("Service started: %s", s.__class__.__name__)
             self.threads.append(_t)
 
-        while self._running and all(t.is_alive() for t in self.threads):
+        governor = self._create_governor(analyzer, self.services)
+
+        while (
+            self._running
+            and not audio.finished
+            and all(t.is_alive() for t in self.threads)
+        ):
             # To stay responsible to things like KeyboardInterrupt
             # sleep(0.1)
-            analyzer.update()
+            self._analyze_frame(analyzer, governor)
 
         for s in self.services:
             s.stop()
@@ -235,6 +424,126 @@ class AudioVisualizer:
         for t in self.threads:
             t.join()
 
+    def _run_service_processes(self, analyzer: Analyzer) -> None:
+        """Like `_run_services`, with every service in its own process"""
+
+        audio = analyzer.audio
+        frames = SharedFrames(analyzer.size, channels=analyzer.channels)
+        stop = multiprocessing.Event()
+
+        processes = [
+            start_service(frames, factory, stop)
+            for factory in self._service_factories()
+        ]
+        logger.info("%d service processes started", len(processes))
+
+        # Services in other processes keep their send rate
+        governor = self._create_governor(analyzer, ())
+
+        try:
+            while (
+                self._running
+                and not audio.finished
+                and all(p.is_alive() for p in processes)
+            ):
+                frames.write(self._analyze_frame(analyzer, governor))
+        finally:
+            stop.set()
+
+            for p in processes:
+                p.join(timeout=5)
+
+            frames.close()
+
+    def _create_governor(
+        self, analyzer: Analyzer, services: Iterable[VAudioService]
+    ) -> Governor | None:
+        if not self._args.governor:
+            return None
+
+        return Governor(
+            analyzer,
+            services,
+            target_fps=self._args.target_fps,
+            cpu_budget=self._args.cpu_budget,
+        )
+
+    def _analyze_frame(self, analyzer: Analyzer, governor: Governor | None) -> Frame:
+        """Update the analyzer and publish a frame (paced by the governor)"""
+
+        if governor is not None:
+            governor.wait()
+
+        with governor.measure() if governor is not None else nullcontext():
+            analyzer.update()
+
+            return analyzer.publish()
+
+    def _open_audio(self) -> AudioSource:
+        """Open the audio file or the input device selected by arguments"""
+
+        if self._args.file is not None:
+            path = Path(self._args.file)
+            paced = not (self._args.benchmark or self._args.render)
+
+            if path.suffix.lower() == ".wav":
+                return WavSource(
+                    path, hop=self._args.hop, paced=paced, downmix=not self._args.stereo
+                )
+
+            return RawSource(
+                path,
+                channels=self._args.channels,
+                hop=self._args.hop,
+                paced=paced,
+                downmix=not self._args.stereo,
+            )
+
+        if self._args.device is not None:
+            device_name = self._args.device
+        else:
+            match sys.platform:
+                case "win32":
+                    device_name = "Stereo Mix"
+                # case "linux":
+                #     device_name = f"Monitor of {get_default_device_pulseaudio()}"
+                case _:
+                    device_name = "default"
+
+        logger.info("Chosen device: `%s`", device_name)
+
+        from .av_audio import Audio
+        from .devices import parse_query
+
+        # device_name = Audio.select()
+
+        index = Audio.select_by_name(parse_query(device_name))
+
+        if index is None:
+            msg = "No audio input device found"
+            raise RuntimeError(msg)
+
+        audio = Audio(
+            channels=self._args.channels,
+            hop=self._args.hop,
+            downmix=not self._args.stereo,
+        )
+        audio.device_index = index
+        audio.setup()
+
+        METRICS.counter_fn(
+            "audio_overruns_total",
+            lambda: audio.overruns,
+            "Input overflows reported by the audio device",
+        )
+        METRICS.counter_fn(
+            "audio_dropped_frames_total",
+            lambda: audio.dropped_frames,
+            "Hops skipped because the analysis lagged",
+        )
+
+        return audio
+
     def stop(self) -> None:
         """Interrupt execution"""
         self._running = False
@@ -255,23 +564,205 @@ class AudioVisualizer:
             help="List available ports",
         )
         parser_serial.add_argument("--noserial", action="store_true", dest="no_serial")
+        parser_serial.add_argument(
+            "--outputs",
+            metavar="CONFIG",
+            help="Send to several serial ports, configured in a JSON file",
+        )
 
         # Analyzer
         parser.add_argument(
             "-m",
             "--mode",
-            choices=["fft", "rolling", "rollingease", "flat"],
+            choices=ANALYZERS.names(),
             default="rolling",
             help="Visualization mode",
         )
         parser.add_argument(
-            "-d", "--device", default=None, help="Select audio input device by name"
+            "-d",
+            "--device",
+            default=None,
+            help="Select audio input device by name, index or /regex/",
+        )
+        parser.add_argument(
+            "-f",
+            "--file",
+            default=None,
+            help="Play a WAV or raw PCM (int16 mono 44100 Hz) file instead",
+        )
+        parser.add_argument(
+            "--benchmark",
+            action="store_true",
+            help="Analyze --file as fast as possible and report frames per second",
         )
 
         parser.add_argument("-s", "--size", default=60, type=int)
+        parser.add_argument(
+            "--scale",
+            choices=["log", "mel", "linear"],
+            default="log",
+            help="Spacing of the frequency bands",
+        )
+        parser.add_argument(
+            "--hop",
+            default=None,
+            type=int,
+            help="Capture in background and analyze every HOP samples",
+        )
+        parser.add_argument(
+            "--channels",
+            default=1,
+            type=int,
+            help="Number of channels to capture (or of a raw --file)",
+        )
+        parser.add_argument(
+            "--stereo",
+            action="store_true",
+            help="Analyze every channel separately instead of their mean",
+        )
+        parser.add_argument(
+            "--beat",
+            action="store_true",
+            help="Detect beats and the tempo (sent with every frame)",
+        )
+        parser.add_argument(
+            "--level-window",
+            default=100,
+            type=int,
+            help="Number of frames the output level is normalized over",
+        )
+        parser.add_argument(
+            "--level-statistic",
+            choices=["mean", "max"],
+            default="mean",
+            help="Normalize by the mean or the maximum peak of the window",
+        )
+        parser.add_argument(
+            "--level-decay",
+            default=None,
+            type=float,
+            help="Let the level fall by at most this factor per frame (e.g. 0.99)",
+        )
+
+        # Shows
+        parser.add_argument(
+            "--render",
+            default=None,
+            metavar="SHOW",
+            help="Analyze --file into a show file (and exit)",
+        )
+        parser.add_argument(
+            "--play",
+            default=None,
+            metavar="SHOW",
+            help="Play a rendered show file instead of analyzing audio",
+        )
+
+        # Serial
+        parser.add_argument(
+            "--serial-format",
+            choices=["text", "binary", "delta"],
+            default="text",
+            help="Serial frame encoding (text for older firmware)",
+        )
+        parser.add_argument(
+            "--serial-sync",
+            choices=["interval", "frame"],
+            default="interval",
+            help="Send at a fixed rate or on every analyzed frame",
+        )
+
+        # HTTP
+        parser.add_argument(
+            "--stream-port",
+            default=None,
+            type=int,
+            help="Push frames to clients on this port (/events SSE, /stream binary)",
+        )
+
+        # UDP
+        parser.add_argument(
+            "--udp",
+            action="append",
+            nargs="?",
+            const="",
+            metavar="HOST[:PORT]",
+            help="Send frames over UDP (repeat for more destinations;"
+            " E1.31 without a host uses multicast)",
+        )
+        parser.add_argument(
+            "--udp-protocol",
+            choices=["raw", "e131"],
+            default="e131",
+            help="UDP packet format",
+        )
+        parser.add_argument(
+            "--universe", default=1, type=int, help="First E1.31 universe"
+        )
+
+        parser.add_argument(
+            "--service",
+            action="append",
+            metavar="NAME",
+            help="Also run a service registered by another package (repeatable)",
+        )
+
+        parser.add_argument(
+            "--multiprocess",
+            action="store_true",
+            help="Run every output service in its own process",
+        )
+
+        # Governor
+        parser.add_argument(
+            "--governor",
+            action="store_true",
+            help="Adapt FFT size, smoothing, send and frame rate to the CPU load",
+        )
+        parser.add_argument(
+            "--target-fps",
+            default=30.0,
+            type=float,
+            help="Frames analyzed per second with --governor",
+        )
+        parser.add_argument(
+            "--cpu-budget",
+            default=0.5,
+            type=float,
+            help="Part of every frame interval the analysis may use (0-1)",
+        )
+
+        # Metrics
+        parser.add_argument(
+            "--metrics",
+            action="store_true",
+            help="Serve pipeline timings on /metrics (not with --multiprocess)",
+        )
 
         parser.parse_args(namespace=self._args)
 
+        if self._args.benchmark and self._args.file is None:
+            parser.error("--benchmark requires --file")
+
+        if self._args.render is not None and self._args.file is None:
+            parser.error("--render requires --file")
+
+        if self._args.metrics and self._args.multiprocess:
+            # The HTTP service would serve the metrics of its own process
+            parser.error("--metrics needs the services in one process")
+
+        if self._args.stereo and self._args.channels > 2:
+            parser.error("--stereo mirrors 2 channels at most (left and right)")
+
+        for name in self._args.service or ():
+            if name in SERVICES.builtins:
+                parser.error(f"--service {name}: built in, use its own options")
+
+            if name not in SERVICES:
+                parser.error(
+                    f"--service {name}: unknown service (one of {SERVICES.plugins()})"
+                )
+
         # Groups:
         # - General
         # - Analyzer